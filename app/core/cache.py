@@ -0,0 +1,173 @@
+"""Cache of read endpoint results and auth lookups, shared by workers when configured.
+
+Decorate an async route to keep its return value, keyed on the route and
+its arguments::
+
+    @router.get("/{uf}/cities")
+    @cached(ttl=600)
+    async def get_cities_by_state(uf: str, db=Depends(get_read_db), user=Depends(get_current_user)):
+
+DB sessions, requests and responses are left out of the key, and so is
+`user` unless `per_user=True` (for routes whose result depends on who is
+asking). Dependencies still run on a hit, so authentication is unchanged;
+only the route body is skipped. Raised exceptions are not cached.
+
+Entries live in the backend of `CACHE_URL` (see `app.core.cache_backend`):
+an LRU of `CACHE_SIZE` entries in this process by default, or Redis to
+share them between workers. Route entries are keyed on the dataset
+version, so results computed from a previous version are never served
+(results read on a replica that has not replayed the current version yet
+are returned but not stored, see `app.db.replicas`);
+a private cache is also emptied when the ETL publishes a new version (see
+`app.core.dataset`), a shared one lets the old entries expire.
+
+The cache never fails a request: when the backend is unreachable, lookups
+count as misses and results are computed from the database. After a
+failure the backend is skipped for `CACHE_RETRY_SECONDS`, so an outage
+does not add a backend timeout to every cache call of every request.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache_backend import CacheBackend, create_backend, pack, unpack
+from app.core.config import settings
+from app.core.dataset import dataset
+
+_UNKEYED = (AsyncSession, Session, Request, Response)
+
+# get() result when the key is not cached (None is a valid cached value)
+MISSING = object()
+
+
+class Cache:
+    """msgpack-encoded values on a backend, with hit/miss counters.
+
+    A small circuit breaker: a failed call takes the backend out of use for
+    `retry_seconds`, after which the next call probes it again.
+    """
+
+    def __init__(self, backend: CacheBackend, retry_seconds: float | None = None):
+        self.backend = backend
+        self.retry_seconds = settings.CACHE_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.down_until = 0.0
+
+    @property
+    def up(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def _failed(self, operation: str, e: Exception) -> None:
+        self.errors += 1
+        # Once per outage, not once per request
+        if not self.down_until:
+            print(f"✗ Cache {operation} failed, serving from the database: {e}")
+        self.down_until = time.monotonic() + self.retry_seconds
+
+    def _recovered(self) -> None:
+        if self.down_until:
+            print("✓ Cache backend is reachable again")
+            self.down_until = 0.0
+
+    async def get(self, key: str) -> Any:
+        data = None
+        if self.up:
+            try:
+                data = await self.backend.get(key)
+            except Exception as e:
+                self._failed("read", e)
+            else:
+                self._recovered()
+        if data is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return unpack(data)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if not self.up:
+            return
+        try:
+            await self.backend.set(key, pack(value), ttl)
+        except Exception as e:
+            self._failed("write", e)
+        else:
+            self._recovered()
+
+    async def invalidate(self, version: str) -> None:
+        """Dataset listener: drop entries built from an older version."""
+        # Workers sharing a backend see the new version at different times;
+        # flushing would also drop what the first ones cached for it
+        if not self.backend.shared:
+            await self.backend.clear()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "up": self.up,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+cache = Cache(create_backend(settings.CACHE_URL, settings.CACHE_SIZE, settings.CACHE_TIMEOUT_SECONDS))
+
+
+def _user_key(user: Any) -> Any:
+    # A User from get_current_user, or the email from get_token_subject
+    return getattr(user, "id", user)
+
+
+def _behind(args: Any, version: str | None) -> bool:
+    """Whether a session among `args` is on a replica not serving `version` yet."""
+    return any(
+        isinstance(arg, AsyncSession) and arg.info.get("dataset_version", version) != version
+        for arg in args
+    )
+
+
+def cached(ttl: float | None = None, per_user: bool = False) -> Callable:
+    """Cache an async route's result for `ttl` seconds (default CACHE_TTL)."""
+    ttl = settings.CACHE_TTL if ttl is None else ttl
+
+    def decorator(route: Callable) -> Callable:
+        if not inspect.iscoroutinefunction(route):
+            raise TypeError(f"cached() needs an async route, got {route.__qualname__}")
+        name = f"{route.__module__}.{route.__qualname__}"
+
+        # FastAPI reads the route's signature through __wrapped__
+        @functools.wraps(route)
+        async def wrapper(**kwargs):
+            args = "&".join(sorted(
+                f"{arg}={value!r}" for arg, value in kwargs.items()
+                if arg != "user" and not isinstance(value, _UNKEYED)
+            ))
+            user = _user_key(kwargs.get("user")) if per_user else ""
+            version = dataset.version
+            key = f"route:{version}:{name}:{user}:{args}"
+            value = await cache.get(key)
+            if value is MISSING:
+                value = await route(**kwargs)
+                if not _behind(kwargs.values(), version):
+                    await cache.set(key, value, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,141 @@
+"""Storage for `app.core.cache`: in-process, or shared over the Redis protocol.
+
+Backends hold msgpack-encoded bytes under string keys with a TTL::
+
+    backend = create_backend(settings.CACHE_URL)  # "memory://" or "redis://host:6379/0"
+    await backend.set("states", pack(value), ttl=300)
+    value = unpack(await backend.get("states"))
+
+With several workers or pods, a Redis backend lets them share one warm
+cache instead of each warming its own after a deploy or an ETL run.
+`RedisBackend` takes any `redis.asyncio` compatible client, so it runs
+as well against `fakeredis.FakeAsyncRedis` or a local `redis-server`.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+import msgpack
+from fastapi.encoders import jsonable_encoder
+
+
+def pack(value: Any) -> bytes:
+    # Cached values are route results: encode them as they will be sent
+    return msgpack.packb(jsonable_encoder(value), use_bin_type=True)
+
+
+def unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
+
+
+class CacheBackend(Protocol):
+    # Whether other processes read and write the same entries
+    shared: bool
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def clear(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+class MemoryBackend:
+    """Bounded LRU of (expiry, value) entries, private to this process."""
+
+    shared = False
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "bytes": sum(len(value) for _, value in self._entries.values()),
+            "evictions": self.evictions,
+        }
+
+
+class RedisBackend:
+    """Keys under `prefix` on a Redis server shared by every worker.
+
+    Size and eviction are left to the server (`maxmemory` with an LRU
+    policy); every key carries its TTL.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "cityscope:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float) -> "RedisBackend":
+        # Only needed when CACHE_URL points at Redis
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout))
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def clear(self) -> None:
+        # SCAN, not KEYS: do not block the server on a large keyspace
+        batch = []
+        async for key in self.client.scan_iter(match=self.prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) == 500:
+                await self.client.delete(*batch)
+                batch.clear()
+        if batch:
+            await self.client.delete(*batch)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+def create_backend(url: str, maxsize: int = 1024, timeout: float = 0.5) -> CacheBackend:
+    if not url or url.startswith("memory://"):
+        return MemoryBackend(maxsize)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(url, timeout)
+    raise ValueError(f"Unsupported CACHE_URL scheme: {url.split('://')[0]}")
@@ -0,0 +1,185 @@
+"""In-process autocomplete index over city names.
+
+Names are normalized (accents folded, case-folded, punctuation turned into
+spaces), so "sao" matches "São Paulo" and "d oeste" matches "D'Oeste".
+Whole names and every later word start are kept in sorted arrays, so a
+query finds its matches with a binary search and never touches Postgres.
+Matches rank by how the query matches the name, then by population:
+
+0. the whole name equals the query
+1. the name starts with the query
+2. a later word of the name starts with the query
+
+The index is rebuilt from the database when the dataset version changes
+(see `app.core.dataset`); lookups keep using the previous one meanwhile.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import and_, select
+
+from app.db.session import AsyncSessionLocal
+from app.models.city import City
+from app.models.indicator import Indicator
+from app.models.latest_indicator_value import LatestIndicatorValue
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Fold accents and case, keep letters and digits separated by single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+
+class CityEntry(NamedTuple):
+    id: int
+    name: str
+    uf: str
+    population: float | None
+
+
+class _RangeTop:
+    """Sorted keys whose matches are listed most populous first.
+
+    A sparse table of range maxima over the populations, in key order,
+    yields the top matches of any key range in O(log n) each, however many
+    cities the range holds.
+    """
+
+    def __init__(self, entries: list[tuple[str, int]], populations: list[float]):
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.cities = [city for _, city in entries]
+        weights = [populations[city] for city in self.cities]
+        self._weights = weights
+        # _table[j][i]: position of the largest weight in [i, i + 2**j)
+        self._table = [list(range(len(weights)))]
+        j = 1
+        while (1 << j) <= len(weights):
+            prev, half = self._table[-1], 1 << (j - 1)
+            self._table.append([
+                a if weights[a] >= weights[b] else b
+                for a, b in zip(prev, prev[half:])
+            ])
+            j += 1
+
+    def _argmax(self, lo: int, hi: int) -> int:
+        j = (hi - lo).bit_length() - 1
+        a, b = self._table[j][lo], self._table[j][hi - (1 << j)]
+        return a if self._weights[a] >= self._weights[b] else b
+
+    def range(self, prefix: str, exact: bool = False) -> tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        # Normalized keys only hold characters below "~"
+        hi = bisect_right(self.keys, prefix) if exact else bisect_left(self.keys, prefix + "~", lo)
+        return lo, hi
+
+    def top(self, lo: int, hi: int) -> Iterator[int]:
+        """City indexes in key range [lo, hi), most populous first."""
+        heap = []
+        if lo < hi:
+            best = self._argmax(lo, hi)
+            heap.append((-self._weights[best], best, lo, hi))
+        while heap:
+            _, best, lo, hi = heapq.heappop(heap)
+            yield self.cities[best]
+            for a, b in ((lo, best), (best + 1, hi)):
+                if a < b:
+                    m = self._argmax(a, b)
+                    heapq.heappush(heap, (-self._weights[m], m, a, b))
+
+
+@dataclass(frozen=True)
+class CityIndex:
+    version: str
+    cities: list[CityEntry]
+    names: _RangeTop  # whole normalized names
+    words: _RangeTop  # the name from its second, third... word on
+    by_uf: dict[str, "CityIndex"] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, version: str, cities: Iterable[CityEntry], by_uf: bool = True) -> "CityIndex":
+        cities = list(cities)
+        populations = [city.population or 0.0 for city in cities]
+        names, words = [], []
+        for i, city in enumerate(cities):
+            parts = normalize(city.name).split(" ")
+            names.append((" ".join(parts), i))
+            words.extend((" ".join(parts[w:]), i) for w in range(1, len(parts)))
+        per_uf = {}
+        if by_uf:
+            grouped: dict[str, list[CityEntry]] = {}
+            for city in cities:
+                grouped.setdefault(city.uf, []).append(city)
+            per_uf = {uf: cls.build(version, group, by_uf=False) for uf, group in grouped.items()}
+        return cls(version, cities, _RangeTop(names, populations), _RangeTop(words, populations), per_uf)
+
+    def search(self, query: str, limit: int = 10, uf: str | None = None) -> list[CityEntry]:
+        if uf:
+            index = self.by_uf.get(uf.upper())
+            return index.search(query, limit) if index else []
+        q = normalize(query)
+        if not q:
+            return []
+        matches = itertools.chain(
+            self.names.top(*self.names.range(q, exact=True)),
+            self.names.top(*self.names.range(q)),
+            self.words.top(*self.words.range(q)),
+        )
+        found: dict[int, None] = {}
+        for i in matches:
+            # A city shows up again in a lower rank or at another word
+            found.setdefault(i)
+            if len(found) == limit:
+                break
+        return [self.cities[i] for i in found]
+
+
+async def load_cities() -> list[CityEntry]:
+    """Every city with its latest population.
+
+    Read from the primary, like the dataset version the index is tagged
+    with: a lagging replica would build an index of the previous data that
+    is not rebuilt until the next version.
+    """
+    population = (
+        select(LatestIndicatorValue.city_id, LatestIndicatorValue.value)
+        .join(Indicator, and_(Indicator.id == LatestIndicatorValue.indicator_id, Indicator.code == "POP"))
+        .subquery("p")
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(City.id, City.name, City.uf, population.c.value)
+                .outerjoin(population, population.c.city_id == City.id)
+                .where(City.name.is_not(None))
+            )
+        ).all()
+    return [CityEntry(*row) for row in rows]
+
+
+class CityIndexHolder:
+    """The current index, swapped atomically on rebuild."""
+
+    def __init__(self):
+        self.index = CityIndex.build("", [])
+
+    async def rebuild(self, version: str) -> None:
+        self.index = CityIndex.build(version, await load_cities())
+        print(f"✓ City search index built: {len(self.index.cities)} cities (dataset {version})")
+
+    def search(self, query: str, limit: int = 10, uf: str | None = None) -> list[CityEntry]:
+        return self.index.search(query, limit, uf)
+
+
+city_index = CityIndexHolder()
@@ -4,12 +4,43 @@ import os
 
 class Settings(BaseModel):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql+psycopg://...")
+    # Read replicas for read-only routes, comma-separated; empty = primary only
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")
+    READ_REPLICA_RETRY_SECONDS: float = float(os.getenv("READ_REPLICA_RETRY_SECONDS", "30"))
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # seconds, -1 = never
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    # PgBouncer in transaction mode: no server-side prepared statements
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "0") == "1"
+    # How often the API checks etl_watermarks for a new dataset version
+    DATASET_POLL_SECONDS: float = float(os.getenv("DATASET_POLL_SECONDS", "30"))
+    # Cache-Control max-age of read endpoints; ETags revalidate them after that
+    HTTP_CACHE_MAX_AGE: int = int(os.getenv("HTTP_CACHE_MAX_AGE", "300"))
+    # Cache of read endpoint results and auth lookups (see app.core.cache):
+    # "memory://" keeps it per process, "redis://host:6379/0" shares it
+    CACHE_URL: str = os.getenv("CACHE_URL", "memory://")
+    CACHE_SIZE: int = int(os.getenv("CACHE_SIZE", "1024"))  # memory:// entries
+    CACHE_TTL: float = float(os.getenv("CACHE_TTL", "300"))
+    CACHE_TIMEOUT_SECONDS: float = float(os.getenv("CACHE_TIMEOUT_SECONDS", "0.5"))
+    # How long an unreachable cache backend is skipped before it is retried
+    CACHE_RETRY_SECONDS: float = float(os.getenv("CACHE_RETRY_SECONDS", "30"))
+    # How long a deactivated user keeps passing get_current_user
+    AUTH_CACHE_TTL: float = float(os.getenv("AUTH_CACHE_TTL", "60"))
     JWT_SECRET: str = os.getenv("JWT_SECRET", "devsecret")
     JWT_ALG: str = os.getenv("JWT_ALG", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
     BACKEND_CORS_ORIGINS: str = os.getenv("BACKEND_CORS_ORIGINS", "http://localhost:3000")
     COOKIE_DOMAIN: str = os.getenv("COOKIE_DOMAIN", "localhost")
+    IBGE_API_URL: str = os.getenv("IBGE_API_URL", "https://servicodados.ibge.gov.br/api/v1")
+    SIDRA_API_URL: str = os.getenv("SIDRA_API_URL", "https://apisidra.ibge.gov.br")
+    ETL_HTTP_CONCURRENCY: int = int(os.getenv("ETL_HTTP_CONCURRENCY", "16"))
+    ETL_HTTP_RATE_LIMIT: float = float(os.getenv("ETL_HTTP_RATE_LIMIT", "20"))
+    ETL_HTTP_MAX_RETRIES: int = int(os.getenv("ETL_HTTP_MAX_RETRIES", "4"))
+    ETL_CACHE_DIR: str = os.getenv("ETL_CACHE_DIR", ".etl_cache")
+    ETL_OFFLINE: bool = os.getenv("ETL_OFFLINE", "0") == "1"
 
 
 settings = Settings()
@@ -0,0 +1,92 @@
+"""In-process view of the dataset version published by the ETL.
+
+The ETL bumps `dataset:version` in `etl_watermarks` after every run that
+changed data (see `app.etl.watermarks`). `DatasetWatcher` polls it every
+`DATASET_POLL_SECONDS` and calls its listeners when it changes, so
+in-process indexes and caches are rebuilt without a restart::
+
+    dataset.on_change(city_index.rebuild)
+    await dataset.start()
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, read_router
+from app.etl.watermarks import DATASET_VERSION
+from app.models.etl_watermark import EtlWatermark
+
+# Before the first ETL run publishes a version
+INITIAL_VERSION = "0"
+
+Listener = Callable[[str], Awaitable[None]]
+
+
+async def version_in(db: AsyncSession) -> str:
+    version = await db.scalar(select(EtlWatermark.value).where(EtlWatermark.source == DATASET_VERSION))
+    return version or INITIAL_VERSION
+
+
+async def read_version() -> str:
+    # From the primary: replicas at different lag would make the version
+    # flip back and forth, rebuilding indexes and dropping caches each time
+    async with AsyncSessionLocal() as db:
+        return await version_in(db)
+
+
+class DatasetWatcher:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.version: str | None = None
+        self._listeners: list[Listener] = []
+        self._task: asyncio.Task | None = None
+
+    def on_change(self, listener: Listener) -> None:
+        """Call `listener(version)` at startup and whenever the version changes."""
+        self._listeners.append(listener)
+
+    async def check(self) -> bool:
+        """Poll once; returns whether the version changed."""
+        version = await read_version()
+        # After the primary: a replica is never seen ahead of it
+        await read_router.refresh_versions(version_in)
+        if version == self.version:
+            return False
+        self.version = version
+        for listener in self._listeners:
+            try:
+                await listener(version)
+            except Exception as e:
+                # Keep serving what was built from the previous version
+                print(f"✗ Dataset listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+        return True
+
+    async def _check_safely(self) -> None:
+        try:
+            await self.check()
+        except Exception as e:
+            print(f"✗ Could not read the dataset version: {e}")
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._check_safely()
+
+    async def start(self) -> None:
+        # The app still starts with the database down; the poller retries
+        await self._check_safely()
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+dataset = DatasetWatcher(settings.DATASET_POLL_SECONDS)
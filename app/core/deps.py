@@ -2,15 +2,18 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 import jwt
 
+from app.core.cache import MISSING, cache
 from app.core.config import settings
-from app.db.session import get_db
-from sqlalchemy.orm import Session
+from app.db.session import get_async_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 
 auth_scheme = HTTPBearer(auto_error=True)
 
 
-def get_current_user(token=Depends(auth_scheme), db: Session = Depends(get_db)) -> User:
+def get_token_subject(token=Depends(auth_scheme)) -> str:
+    """Email of a validly signed, unexpired access token, without a DB lookup."""
     try:
         payload = jwt.decode(token.credentials, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
         email = payload.get("sub")
@@ -18,10 +21,28 @@ def get_current_user(token=Depends(auth_scheme), db: Session = Depends(get_db))
             raise ValueError
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return email
 
-    user = db.query(User).filter(User.email == email).first()
+
+# Users are read from the primary: a replica may not have a fresh signup yet.
+# Active users are then cached for AUTH_CACHE_TTL (without their password
+# hash), so the session's connection is only checked out on a miss.
+async def get_current_user(
+    email: str = Depends(get_token_subject), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    key = f"user:{email}"
+    found = await cache.get(key)
+    if found is not MISSING:
+        return User(**found)
+    user = await db.scalar(select(User).where(User.email == email).limit(1))
+    # End the transaction: the connection goes back to the pool while the
+    # route runs (the session itself stays usable)
+    await db.commit()
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+    await cache.set(
+        key,
+        {"id": user.id, "email": user.email, "is_active": user.is_active},
+        settings.AUTH_CACHE_TTL,
+    )
     return user
-
-
@@ -0,0 +1,51 @@
+"""HTTP caching of read endpoints, keyed on the dataset version.
+
+Read endpoints only change when the ETL publishes a new dataset version
+(see `app.core.dataset`), so their ETag is a hash of that version and of
+the request path and query. Add `dataset_etag` to a route's
+`dependencies` after any authentication check::
+
+    @router.get("", dependencies=[Depends(get_token_subject), Depends(dataset_etag)])
+
+Route-level dependencies run before the route's parameters are resolved,
+so a matching If-None-Match is answered with 304 before a DB session is
+opened or the user is loaded. The version is the one last seen by this
+process, so a new dataset is picked up within `DATASET_POLL_SECONDS`.
+"""
+
+import hashlib
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.core.config import settings
+from app.core.dataset import dataset
+
+
+def etag_for(request: Request) -> str:
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    key = f"{dataset.version}|{request.url.path}|{query}"
+    return f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): ignore W/ prefixes
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def dataset_etag(request: Request, response: Response) -> None:
+    """Set ETag and Cache-Control, or answer 304 if the client's copy is current."""
+    headers = {
+        "ETag": etag_for(request),
+        "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE}",
+    }
+    if "authorization" in request.headers:
+        # Shared caches must not hand one user's response to another request
+        headers["Vary"] = "Authorization"
+    if _matches(request.headers.get("if-none-match"), headers["ETag"]):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
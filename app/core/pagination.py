@@ -0,0 +1,31 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row of a page, JSON-encoded and
+base64url'd. Clients pass it back unchanged to get the rows after it.
+"""
+
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*key) -> str:
+    raw = json.dumps(key, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple[type, ...]) -> list:
+    """The sort key in `cursor`; 400 unless it holds one value of each of `types`."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(key, list) or len(key) != len(types):
+            raise ValueError
+        # type() rather than isinstance(): JSON true/false must not pass as int
+        if any(type(value) is not expected for value, expected in zip(key, types)):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return key
@@ -19,8 +19,13 @@ from app.db.base import Base
 
 # Import ALL models to register metadata with Base
 from app.models.city import City
+from app.models.city_snapshot import CitySnapshot
+from app.models.etl_step_run import EtlStepRun
+from app.models.etl_watermark import EtlWatermark
 from app.models.indicator import Indicator
-from app.models.indicator_value import IndicatorValue
+from app.models.indicator_value import IndicatorValue, is_partition
+from app.models.latest_indicator_value import LatestIndicatorValue
+from app.models.staging import StagingCity, StagingIndicatorValue
 from app.models.user import User
 
 # Import settings for database URL
@@ -33,12 +38,24 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table":
+        # indicator_values partitions are created by a trigger, not by the models
+        if reflected and compare_to is None and is_partition(name):
+            return False
+        # Materialized views are mapped for reads but created by hand
+        if not reflected and object.info.get("is_view"):
+            return False
+    return True
+
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -54,7 +71,11 @@ def run_migrations_online():
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,38 @@
+"""latest_indicator_values materialized view
+
+Revision ID: 5138287d5ab0
+Revises: df4c133382ae
+Create Date: 2026-10-18 07:58:40.207731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5138287d5ab0'
+down_revision: Union[str, Sequence[str], None] = 'df4c133382ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Latest year per (city, indicator); static indicators only have a NULL year
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW latest_indicator_values AS
+        SELECT DISTINCT ON (city_id, indicator_id) city_id, indicator_id, year, value
+        FROM indicator_values
+        ORDER BY city_id, indicator_id, year DESC NULLS LAST
+        """
+    )
+    # REFRESH ... CONCURRENTLY needs a unique index on plain columns
+    op.create_index('uq_latest_indicator_values_city_indicator', 'latest_indicator_values', ['city_id', 'indicator_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP MATERIALIZED VIEW latest_indicator_values')
@@ -0,0 +1,122 @@
+"""partition indicator_values by indicator
+
+Revision ID: df4c133382ae
+Revises: 903848a911af
+Create Date: 2026-10-18 07:40:12.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'df4c133382ae'
+down_revision: Union[str, Sequence[str], None] = '903848a911af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the old table (and its id sequence) around until the rows are copied
+    op.rename_table('indicator_values', 'indicator_values_old')
+    op.drop_index('uq_indicator_values_city_indicator_year', table_name='indicator_values_old')
+    op.execute('ALTER TABLE indicator_values_old RENAME CONSTRAINT indicator_values_pkey TO indicator_values_old_pkey')
+
+    op.create_table('indicator_values',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('indicator_values_id_seq'::regclass)"), nullable=False),
+    sa.Column('city_id', sa.Integer(), nullable=True),
+    sa.Column('indicator_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=True),
+    sa.Column('value', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['city_id'], ['cities.id'], ),
+    sa.ForeignKeyConstraint(['indicator_id'], ['indicators.id'], ),
+    sa.PrimaryKeyConstraint('id', 'indicator_id'),
+    postgresql_partition_by='LIST (indicator_id)'
+    )
+    op.create_index('uq_indicator_values_city_indicator_year', 'indicator_values', ['city_id', 'indicator_id', 'year'], unique=True, postgresql_nulls_not_distinct=True, postgresql_include=['value'])
+    op.execute('ALTER SEQUENCE indicator_values_id_seq OWNED BY indicator_values.id')
+
+    # One partition per indicator, created as soon as the indicator is
+    op.execute(
+        """
+        CREATE FUNCTION create_indicator_values_partition() RETURNS trigger AS $$
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF indicator_values FOR VALUES IN (%s)',
+                'indicator_values_' || NEW.id,
+                NEW.id
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER indicators_create_partition
+        AFTER INSERT ON indicators
+        FOR EACH ROW EXECUTE FUNCTION create_indicator_values_partition()
+        """
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE indicator_id integer;
+        BEGIN
+            FOR indicator_id IN SELECT id FROM indicators LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF indicator_values FOR VALUES IN (%s)',
+                    'indicator_values_' || indicator_id,
+                    indicator_id
+                );
+            END LOOP;
+        END;
+        $$
+        """
+    )
+
+    # Values without an indicator have no partition to go to
+    op.execute(
+        """
+        INSERT INTO indicator_values (id, city_id, indicator_id, year, value)
+        SELECT id, city_id, indicator_id, year, value
+        FROM indicator_values_old
+        WHERE indicator_id IS NOT NULL
+        """
+    )
+    op.drop_table('indicator_values_old')
+    op.execute('ANALYZE indicator_values')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER indicators_create_partition ON indicators')
+    op.execute('DROP FUNCTION create_indicator_values_partition()')
+
+    op.rename_table('indicator_values', 'indicator_values_partitioned')
+    op.drop_index('uq_indicator_values_city_indicator_year', table_name='indicator_values_partitioned')
+    op.execute('ALTER TABLE indicator_values_partitioned RENAME CONSTRAINT indicator_values_pkey TO indicator_values_partitioned_pkey')
+
+    op.create_table('indicator_values',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('indicator_values_id_seq'::regclass)"), nullable=False),
+    sa.Column('city_id', sa.Integer(), nullable=True),
+    sa.Column('indicator_id', sa.Integer(), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=True),
+    sa.Column('value', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['city_id'], ['cities.id'], ),
+    sa.ForeignKeyConstraint(['indicator_id'], ['indicators.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_indicator_values_city_indicator_year', 'indicator_values', ['city_id', 'indicator_id', 'year'], unique=True, postgresql_nulls_not_distinct=True, postgresql_include=['value'])
+    op.execute('ALTER SEQUENCE indicator_values_id_seq OWNED BY indicator_values.id')
+    op.execute(
+        """
+        INSERT INTO indicator_values (id, city_id, indicator_id, year, value)
+        SELECT id, city_id, indicator_id, year, value FROM indicator_values_partitioned
+        """
+    )
+    # Drops every partition with it
+    op.drop_table('indicator_values_partitioned')
@@ -0,0 +1,107 @@
+"""Connection pool configuration and metrics.
+
+Both engines get their pool settings from `Settings` (`DB_POOL_*`). With
+`DB_PGBOUNCER=1` the engines are set up for PgBouncer in transaction mode:
+consecutive transactions may run on different server connections, so
+psycopg's server-side prepared statements are turned off.
+
+Each engine's pool is a metered subclass of its default pool class that
+counts checkouts, checkout timeouts and the time spent waiting for a
+connection; `pool_status` adds the live state of the pool.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+@dataclass
+class PoolMetrics:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+
+class _MeteredPool:
+    """Mixin timing `connect()`, i.e. the wait for a pooled connection."""
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # QueuePool only keeps it private; recreate() passes it back in
+        self.max_overflow: int | None = kwargs.get("max_overflow")
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def metered_pool_class(pool_class: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    # A subclass per engine: Pool.recreate() (engine.dispose()) keeps the class
+    return type(f"Metered{pool_class.__name__}", (_MeteredPool, pool_class), {"metrics": metrics})
+
+
+def engine_options(metrics: PoolMetrics, is_async: bool = False) -> dict[str, Any]:
+    """Keyword arguments for `create_engine` / `create_async_engine`."""
+    options: dict[str, Any] = {
+        "poolclass": metered_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_PGBOUNCER:
+        options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+    """Live pool state plus the counters of a metered pool."""
+    metrics: PoolMetrics | None = getattr(pool, "metrics", None)
+    status: dict[str, Any] = {}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # overflow() counts down from -size while the pool fills up
+            overflow=max(pool.overflow(), 0),
+            max_overflow=getattr(pool, "max_overflow", None),
+        )
+    if metrics is not None:
+        status.update(
+            checkouts=metrics.checkouts,
+            checkout_timeouts=metrics.timeouts,
+            wait_seconds_total=round(metrics.wait_seconds, 6),
+            wait_seconds_avg=round(metrics.wait_seconds / metrics.checkouts, 6) if metrics.checkouts else 0.0,
+            wait_seconds_max=round(metrics.max_wait_seconds, 6),
+        )
+    return status
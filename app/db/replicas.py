@@ -0,0 +1,130 @@
+"""Routing of read-only sessions to read replicas.
+
+`READ_DATABASE_URL` holds one replica URL or several, comma-separated.
+Sessions are handed out round-robin over the replicas that are up. A
+replica whose connection fails is marked down and skipped for
+`READ_REPLICA_RETRY_SECONDS`, after which the next checkout probes it
+again. With no replica configured or none up, sessions come from the
+primary.
+
+Replicas lag the primary. Each replica session carries, in
+`session.info["dataset_version"]`, the dataset version last read on that
+replica (see `refresh_versions`), so callers such as the response cache
+can tell results of the previous dataset from current ones.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.db.pool import PoolMetrics, engine_options, pool_status
+
+
+@dataclass
+class Replica:
+    url: str
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker[AsyncSession]
+    metrics: PoolMetrics
+    down_until: float = 0.0
+    failures: int = 0
+    last_error: str | None = field(default=None, repr=False)
+    # Dataset version this replica served at the last refresh_versions()
+    version: str | None = None
+
+    @property
+    def up(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self, error: Exception) -> None:
+        self.failures += 1
+        self.last_error = str(error).splitlines()[0] if str(error) else type(error).__name__
+        self.down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+
+    def status(self) -> dict[str, Any]:
+        return {
+            # Never leak credentials into the metrics endpoint
+            "url": make_url(self.url).render_as_string(hide_password=True),
+            "up": self.up,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "dataset_version": self.version,
+            "pool": pool_status(self.engine.pool),
+        }
+
+
+class ReplicaRouter:
+    def __init__(self, urls: list[str], primary: async_sessionmaker[AsyncSession]):
+        self.primary = primary
+        self.replicas = []
+        for url in urls:
+            metrics = PoolMetrics()
+            engine = create_async_engine(url, **engine_options(metrics, is_async=True))
+            self.replicas.append(
+                Replica(url, engine, async_sessionmaker(engine, autoflush=False, expire_on_commit=False), metrics)
+            )
+        self._next = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self.primary_fallbacks = 0
+
+    async def session(self) -> AsyncSession:
+        """A session on the next replica that is up, or on the primary."""
+        return await self.replica_session() or self.primary()
+
+    async def replica_session(self) -> AsyncSession | None:
+        """A session on the next replica that is up, or None to use the primary."""
+        if self._next is not None:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._next)]
+                if not replica.up:
+                    continue
+                db = replica.sessionmaker()
+                try:
+                    # Check out a connection now (pre-pinged), so a dead
+                    # replica fails here and not inside the route
+                    await db.connection()
+                except (exc.OperationalError, exc.InterfaceError, exc.TimeoutError, OSError) as e:
+                    await db.close()
+                    replica.mark_down(e)
+                    continue
+                db.info["dataset_version"] = replica.version
+                return db
+            self.primary_fallbacks += 1
+        return None
+
+    async def refresh_versions(self, read: Callable[[AsyncSession], Awaitable[str]]) -> None:
+        """Read the dataset version each replica that is up currently serves."""
+        for replica in self.replicas:
+            if not replica.up:
+                continue
+            try:
+                async with replica.sessionmaker() as db:
+                    replica.version = await read(db)
+            except (exc.OperationalError, exc.InterfaceError, exc.TimeoutError, OSError) as e:
+                replica.mark_down(e)
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "replicas": [replica.status() for replica in self.replicas],
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def replica_urls() -> list[str]:
+    return [url.strip() for url in settings.READ_DATABASE_URL.split(",") if url.strip()]
@@ -1,12 +1,30 @@
 # app/db/session.py
+from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.db.base import Base
+from app.db.pool import PoolMetrics, engine_options
+from app.db.replicas import ReplicaRouter, replica_urls
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+# Sync engine: ETL, migrations, scripts and the auth routes
+engine = create_engine(settings.DATABASE_URL, **engine_options(sync_pool_metrics))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the read routes; psycopg 3 speaks asyncio natively, so the
+# same postgresql+psycopg URL works for both
+async_engine = create_async_engine(
+    settings.DATABASE_URL, **engine_options(async_pool_metrics, is_async=True)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read-only routes go to READ_DATABASE_URL replicas, falling back to the primary
+read_router = ReplicaRouter(replica_urls(), primary=AsyncSessionLocal)
+
 
 def get_db():
     db = SessionLocal()
@@ -14,3 +32,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(primary: AsyncSession = Depends(get_async_db)):
+    """Session for read-only routes: a replica when one is up, else the primary.
+
+    The primary fallback is the request's `get_async_db` session, the one
+    `get_current_user` uses, so a request never holds two primary
+    connections at once.
+    """
+    db = await read_router.replica_session()
+    if db is None:
+        yield primary
+        return
+    async with db:
+        yield db
@@ -0,0 +1,115 @@
+"""Compare the ways of writing indicator values into `indicator_values`.
+
+Usage::
+
+    python -m app.etl.benchmarks.bulk_write --years 20 --orm-rows 5000
+
+Each approach loads the same synthetic (city, year, value) rows for a
+scratch indicator twice: into an empty indicator (inserts), then with new
+values (updates). Everything runs inside a transaction that is rolled back,
+so the database is left untouched. Needs the cities table to be loaded.
+"""
+
+import argparse
+import time
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.etl.bulk import copy_indicator_values
+from app.etl.ibge.common import batched, upsert_indicator_values
+from app.models.city import City
+from app.models.indicator import Indicator
+from app.models.indicator_value import IndicatorValue
+
+
+def write_orm(db: Session, indicator_id: int, rows: list[tuple]) -> None:
+    """Previous loader path: one SELECT plus one ORM object per row."""
+    for city_id, year, value in rows:
+        existing = db.query(IndicatorValue).filter(
+            IndicatorValue.city_id == city_id,
+            IndicatorValue.indicator_id == indicator_id,
+            IndicatorValue.year == year,
+        ).first()
+        if existing:
+            existing.value = value
+        else:
+            db.add(IndicatorValue(city_id=city_id, indicator_id=indicator_id, year=year, value=value))
+    db.flush()
+
+
+def write_unnest(db: Session, indicator_id: int, rows: list[tuple]) -> None:
+    for batch in batched(rows):
+        upsert_indicator_values(db, indicator_id, batch)
+
+
+def write_copy_text(db: Session, indicator_id: int, rows: list[tuple]) -> None:
+    copy_indicator_values(db, indicator_id, rows, binary=False)
+
+
+def write_copy_binary(db: Session, indicator_id: int, rows: list[tuple]) -> None:
+    copy_indicator_values(db, indicator_id, rows, binary=True)
+
+
+APPROACHES = {
+    "orm": write_orm,
+    "unnest": write_unnest,
+    "copy-text": write_copy_text,
+    "copy-binary": write_copy_binary,
+}
+
+
+def measure(write, rows: list[tuple]) -> tuple[float, float]:
+    """Seconds taken to insert `rows`, then to update them all."""
+    db = SessionLocal()
+    try:
+        indicator = Indicator(code="BENCH_WRITE", name="Bulk write benchmark", unit="")
+        db.add(indicator)
+        db.flush()
+
+        started = time.perf_counter()
+        write(db, indicator.id, rows)
+        inserted = time.perf_counter() - started
+
+        changed = [(city_id, year, value + 1) for city_id, year, value in rows]
+        started = time.perf_counter()
+        write(db, indicator.id, changed)
+        updated = time.perf_counter() - started
+        return inserted, updated
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=20, help="years per city")
+    parser.add_argument("--orm-rows", type=int, default=5000, help="row cap for the slow ORM path")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        city_ids = [city_id for (city_id,) in db.query(City.id).order_by(City.id)]
+    finally:
+        db.close()
+    if not city_ids:
+        raise SystemExit("No cities loaded; run the cities ETL first")
+
+    rows = [
+        (city_id, 2000 + year, float(city_id % 9973 + year))
+        for city_id in city_ids
+        for year in range(args.years)
+    ]
+    print(f"{len(rows)} rows ({len(city_ids)} cities x {args.years} years)")
+    print(f"{'approach':<13}{'rows':>9}{'insert s':>10}{'update s':>10}{'rows/s':>11}")
+    for name, write in APPROACHES.items():
+        sample = rows[: args.orm_rows] if name == "orm" else rows
+        inserted, updated = measure(write, sample)
+        print(
+            f"{name:<13}{len(sample):>9}{inserted:>10.2f}{updated:>10.2f}"
+            f"{len(sample) / inserted:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
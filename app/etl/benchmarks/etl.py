@@ -0,0 +1,200 @@
+"""End-to-end ETL benchmark against a local stand-in of the IBGE APIs.
+
+Usage::
+
+    python -m app.etl.benchmarks.etl --reset --years 24
+    python -m app.etl.benchmarks.etl --reset --save-baseline
+
+Serves synthetic fixtures (5,570 municipalities, SIDRA population for every
+year in `--years`) from a local HTTP server and runs `load_cities`,
+`load_population` and `load_density` in three phases:
+
+- cold: empty tables, every row is inserted
+- warm: the same payloads again, every row is unchanged
+- update: new fixture values, every row is updated
+
+Each stage reports rows/s, DB round trips (SQL statements sent through
+SQLAlchemy; COPY streams are not counted) and peak RSS (of the whole process, stand-in server
+included), and is compared with `baselines.json`; the command exits with
+status 1 if any stage regressed beyond `--tolerance`. Baselines are only
+meaningful on the machine that recorded them: re-record with
+`--save-baseline` when moving hardware.
+
+It writes to DATABASE_URL: point it at a scratch database. `--reset`
+truncates the cities, indicators, indicator values and ETL watermarks first
+and is required for a meaningful cold phase.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.etl.benchmarks.standin import StandInServer
+from app.etl.ibge.cities import load_cities
+from app.etl.ibge.density import load_density
+from app.etl.ibge.population import load_population
+from app.etl.profiling import track_peak_rss
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+STAGES = {
+    "cities": load_cities,
+    "population": load_population,
+    "density": load_density,
+}
+
+
+@dataclass
+class StageResult:
+    seconds: float
+    rows: int
+    written: int
+    round_trips: int
+    peak_rss_mb: float
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class RoundTripCounter:
+    """Counts statements sent through the SQLAlchemy engine."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args) -> None:
+        # Loaders may write from worker threads
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self) -> "RoundTripCounter":
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(engine, "before_cursor_execute", self)
+
+
+def reset_tables() -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            text("TRUNCATE indicator_values, cities, indicators, etl_watermarks RESTART IDENTITY CASCADE")
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_stage(load) -> StageResult:
+    with RoundTripCounter() as trips, track_peak_rss() as memory:
+        started = time.perf_counter()
+        stats = load()
+        seconds = time.perf_counter() - started
+    return StageResult(
+        seconds=seconds,
+        rows=stats.written + stats.skipped,
+        written=stats.written,
+        round_trips=trips.count,
+        peak_rss_mb=memory.peak_mb,
+    )
+
+
+def compare(phase: str, stage: str, result: StageResult, baselines: dict, tolerance: float) -> list[str]:
+    """Regressions of `result` against the stored baseline, as messages."""
+    base = baselines.get(phase, {}).get(stage)
+    if not base:
+        return []
+    problems = []
+    if result.rows_per_s < base["rows_per_s"] * (1 - tolerance):
+        problems.append(f"rows/s {result.rows_per_s:.0f} < baseline {base['rows_per_s']:.0f}")
+    if result.round_trips > base["round_trips"] * (1 + tolerance):
+        problems.append(f"round trips {result.round_trips} > baseline {base['round_trips']}")
+    if result.peak_rss_mb > base["peak_rss_mb"] * (1 + tolerance):
+        problems.append(f"peak RSS {result.peak_rss_mb:.0f} MB > baseline {base['peak_rss_mb']:.0f} MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=24, help="SIDRA years per municipality")
+    parser.add_argument("--reset", action="store_true", help="truncate the ETL tables first")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression ratio")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write {BASELINES.name}")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset_tables()
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+
+    # Talk to the stand-in only, and always over HTTP
+    settings.ETL_CACHE_DIR = ""
+    settings.ETL_OFFLINE = False
+
+    results: dict[str, dict[str, StageResult]] = {}
+    regressions = []
+    with StandInServer(years=range(2025 - args.years, 2025)) as server:
+        settings.IBGE_API_URL = server.ibge_url
+        settings.SIDRA_API_URL = server.sidra_url
+
+        for phase, seed in [("cold", 0), ("warm", 0), ("update", 1)]:
+            server.reseed(seed)
+            print(f"--- {phase} ---")
+            results[phase] = {}
+            for stage, load in STAGES.items():
+                result = run_stage(load)
+                results[phase][stage] = result
+                for problem in compare(phase, stage, result, baselines, args.tolerance):
+                    regressions.append(f"{phase}/{stage}: {problem}")
+
+    print()
+    print(
+        f"{'phase':<8}{'stage':<12}{'seconds':>9}{'rows':>9}{'written':>9}"
+        f"{'rows/s':>10}{'trips':>8}{'RSS MB':>8}"
+    )
+    for phase, stages in results.items():
+        for stage, r in stages.items():
+            print(
+                f"{phase:<8}{stage:<12}{r.seconds:>9.2f}{r.rows:>9}{r.written:>9}"
+                f"{r.rows_per_s:>10.0f}{r.round_trips:>8}{r.peak_rss_mb:>8.0f}"
+            )
+
+    if args.save_baseline:
+        BASELINES.write_text(json.dumps(
+            {
+                phase: {
+                    stage: {
+                        **asdict(r),
+                        "seconds": round(r.seconds, 3),
+                        "peak_rss_mb": round(r.peak_rss_mb, 1),
+                        "rows_per_s": round(r.rows_per_s, 1),
+                    }
+                    for stage, r in stages.items()
+                }
+                for phase, stages in results.items()
+            },
+            indent=2,
+        ) + "\n")
+        print(f"✓ Saved baselines to {BASELINES}")
+    elif regressions:
+        print()
+        print(f"✗ {len(regressions)} regressions against {BASELINES.name}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    elif baselines:
+        print(f"✓ No regressions against {BASELINES.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Synthetic IBGE payloads shaped like the real APIs.
+
+`municipios()` mimics `localidades/municipios` (5,570 items with the real
+per-UF counts) and `sidra_table()` a SIDRA `/values` answer for one UF with
+a header row and one row per municipality and year. Values are derived from
+`seed`, so two fixtures with different seeds differ in every value.
+"""
+
+import json
+import random
+
+from app.etl.ibge.common import UF_CODES
+
+# Municipalities per UF, as of the 2022 census
+MUNICIPALITIES_PER_UF = {
+    11: 52, 12: 22, 13: 62, 14: 15, 15: 144, 16: 16, 17: 139,
+    21: 217, 22: 224, 23: 184, 24: 167, 25: 223, 26: 185, 27: 102, 28: 75, 29: 417,
+    31: 853, 32: 78, 33: 92, 35: 645,
+    41: 399, 42: 295, 43: 497,
+    50: 79, 51: 141, 52: 246, 53: 1,
+}
+
+REGIONS = {
+    1: ("N", "Norte"),
+    2: ("NE", "Nordeste"),
+    3: ("SE", "Sudeste"),
+    4: ("S", "Sul"),
+    5: ("CO", "Centro-Oeste"),
+}
+
+
+def ibge_ids(uf_code: int) -> list[int]:
+    """Seven-digit municipality codes for one UF."""
+    return [uf_code * 100_000 + i * 10 for i in range(1, MUNICIPALITIES_PER_UF[uf_code] + 1)]
+
+
+def municipios(seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    items = []
+    for uf_code, uf in UF_CODES.items():
+        region_id = uf_code // 10
+        region_sigla, region_name = REGIONS[region_id]
+        uf_obj = {
+            "id": uf_code,
+            "sigla": uf,
+            "nome": f"Estado {uf}",
+            "regiao": {"id": region_id, "sigla": region_sigla, "nome": region_name},
+        }
+        for n, ibge_id in enumerate(ibge_ids(uf_code)):
+            items.append({
+                "id": ibge_id,
+                "nome": f"Município {uf}-{n:03d}",
+                "area": round(rng.uniform(3, 160_000), 3),
+                "microrregiao": {
+                    "id": uf_code * 1000 + n % 20,
+                    "nome": f"Microrregião {uf}-{n % 20}",
+                    "mesorregiao": {
+                        "id": uf_code * 100 + n % 5,
+                        "nome": f"Mesorregião {uf}-{n % 5}",
+                        "UF": uf_obj,
+                    },
+                },
+                "regiao-imediata": {
+                    "id": uf_code * 10_000 + n % 40,
+                    "nome": f"Região imediata {uf}-{n % 40}",
+                    "regiao-intermediaria": {
+                        "id": uf_code * 100 + n % 8,
+                        "nome": f"Região intermediária {uf}-{n % 8}",
+                        "UF": uf_obj,
+                    },
+                },
+            })
+    return items
+
+
+def sidra_table(
+    table: int, variable: int, uf_code: int, years: list[int], seed: int = 0
+) -> list[dict]:
+    rng = random.Random(f"{seed}:{table}:{variable}:{uf_code}")
+    rows = [{
+        "NC": "Nível Territorial (Código)",
+        "NN": "Nível Territorial",
+        "MC": "Unidade de Medida (Código)",
+        "MN": "Unidade de Medida",
+        "V": "Valor",
+        "D1C": "Município (Código)",
+        "D1N": "Município",
+        "D2C": "Variável (Código)",
+        "D2N": "Variável",
+        "D3C": "Ano (Código)",
+        "D3N": "Ano",
+    }]
+    for ibge_id in ibge_ids(uf_code):
+        base = rng.randint(800, 12_000_000)
+        for year in years:
+            rows.append({
+                "NC": "6",
+                "NN": "Município",
+                "MC": "45",
+                "MN": "Pessoas",
+                "V": str(base + (year - years[0]) * rng.randint(0, 500)),
+                "D1C": str(ibge_id),
+                "D1N": f"Município {ibge_id}",
+                "D2C": str(variable),
+                "D2N": f"Variável {variable}",
+                "D3C": str(year),
+                "D3N": str(year),
+            })
+    return rows
+
+
+def encode(data: list[dict]) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode()
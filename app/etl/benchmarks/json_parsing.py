@@ -0,0 +1,89 @@
+"""Compare full-body `json.loads` against the streaming SIDRA parser.
+
+Usage::
+
+    python -m app.etl.benchmarks.json_parsing --rows 500000
+
+Writes a synthetic SIDRA table to a temporary file, then parses it both
+ways and reports throughput and peak Python heap (tracemalloc) for each.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.etl.ibge.sidra import iter_rows, parse_row
+from app.etl.jsonstream import read_chunks
+
+
+def write_sidra_table(path: Path, rows: int) -> None:
+    """Write a SIDRA-shaped JSON array with a header row and `rows` values."""
+    with path.open("w") as f:
+        f.write('[{"NC":"Nível Territorial (Código)","D1C":"Município (Código)","D3C":"Ano","V":"Valor"}')
+        for i in range(rows):
+            ibge_id = 1100015 + i // 20
+            row = {
+                "NC": "6",
+                "NN": "Município",
+                "MC": "45",
+                "MN": "Pessoas",
+                "V": str(1000 + i % 97_000),
+                "D1C": str(ibge_id),
+                "D1N": f"Município {ibge_id} - UF",
+                "D2C": "93",
+                "D2N": "População residente estimada",
+                "D3C": str(2001 + i % 20),
+                "D3N": str(2001 + i % 20),
+            }
+            f.write(",")
+            f.write(json.dumps(row, ensure_ascii=False))
+        f.write("]")
+
+
+def parse_full(path: Path) -> int:
+    """Current approach: decode the whole body, then walk the rows."""
+    data = json.loads(path.read_bytes())
+    rows = [parse_row(row) for row in data[1:]]
+    return sum(1 for row in rows if row)
+
+
+def parse_streaming(path: Path) -> int:
+    """Streaming approach: decode and consume one row at a time."""
+    with path.open("rb") as f:
+        return sum(1 for _ in iter_rows(read_chunks(f)))
+
+
+def measure(fn, path: Path) -> tuple[int, float, float]:
+    # Time and memory are taken in separate runs: tracemalloc slows parsing down
+    started = time.perf_counter()
+    count = fn(path)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sidra.json"
+        write_sidra_table(path, args.rows)
+        size_mb = path.stat().st_size / 2**20
+        print(f"Synthetic SIDRA table: {args.rows} rows, {size_mb:.1f} MB")
+        print(f"{'approach':<12}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+        for name, fn in [("json.loads", parse_full), ("streaming", parse_streaming)]:
+            count, elapsed, peak_mb = measure(fn, path)
+            print(f"{name:<12}{count:>10}{elapsed:>10.2f}{count / elapsed:>12.0f}{peak_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
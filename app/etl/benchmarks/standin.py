@@ -0,0 +1,112 @@
+"""Local stand-in for the IBGE localidades and SIDRA APIs.
+
+Serves the synthetic payloads from `fixtures.py` so the ETL can run end to
+end without the network::
+
+    with StandInServer(years=range(2001, 2025)) as server:
+        settings.IBGE_API_URL = server.ibge_url
+        settings.SIDRA_API_URL = server.sidra_url
+        ...
+"""
+
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable
+from urllib.parse import unquote
+
+from app.etl.benchmarks import fixtures
+
+SIDRA_SHARD = re.compile(r"^/values/t/(\d+)/n6/in n3 (\d+)/v/(\d+)/p/([\w,]+)(?:/c\d+/[\w,]+)*$")
+
+
+class StandInServer:
+    """Threaded HTTP server on 127.0.0.1 and a random port."""
+
+    def __init__(self, years: Iterable[int], seed: int = 0):
+        self.years = list(years)
+        self.seed = seed
+        self.requests = 0
+        self._bodies: dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def ibge_url(self) -> str:
+        return f"{self.base_url}/api/v1"
+
+    @property
+    def sidra_url(self) -> str:
+        return self.base_url
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reseed(self, seed: int) -> None:
+        """Serve fixtures generated from another seed from now on."""
+        with self._lock:
+            if seed != self.seed:
+                self.seed = seed
+                self._bodies.clear()
+
+    def body(self, path: str) -> bytes | None:
+        """Payload for a request path, or None if the path is not served."""
+        if path == "/api/v1/localidades/municipios":
+            return self._cached(("municipios",), lambda: fixtures.encode(fixtures.municipios(self.seed)))
+
+        match = SIDRA_SHARD.match(path)
+        if not match:
+            return None
+        table, uf_code, variable, period = match.groups()
+        if int(uf_code) not in fixtures.MUNICIPALITIES_PER_UF:
+            return None
+        years = self.years if period == "all" else [int(p) for p in period.split(",")]
+        key = (int(table), int(variable), int(uf_code), tuple(years))
+        return self._cached(
+            key,
+            lambda: fixtures.encode(
+                fixtures.sidra_table(int(table), int(variable), int(uf_code), years, self.seed)
+            ),
+        )
+
+    def _cached(self, key: tuple, build) -> bytes:
+        with self._lock:
+            if key not in self._bodies:
+                self._bodies[key] = build()
+            return self._bodies[key]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                body = server.body(unquote(self.path))
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,140 @@
+"""Bulk writes into `indicator_values` through an UNLOGGED staging table.
+
+Loaders stream `(city_id, year, value)` rows with psycopg's
+`COPY ... FROM STDIN` into `staging_indicator_values`, tagged with a load
+id, committing as they go. The serving table is only touched by the final
+`merge_staged_values`, one set-based upsert per indicator in a short
+transaction, so API reads never wait on a running load and a failed load
+leaves the serving data as it was. A full reload of an indicator can
+instead replace the contents of its `indicator_values` partition with
+`replace_staged_values`.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Iterable
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.etl.ibge.common import LoadStats, upsert_indicator_values_from
+from app.models.indicator_value import IndicatorValue, partition_table
+from app.models.staging import StagingIndicatorValue
+
+COPY_BATCH_SIZE = 50_000
+
+_COLUMNS = "load_id, indicator_id, city_id, year, value"
+
+
+def new_load_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _copy_rows(cursor, load_id: str, indicator_id: int, rows, binary: bool) -> int:
+    statement = f"COPY {StagingIndicatorValue.__tablename__} ({_COLUMNS}) FROM STDIN"
+    count = 0
+    with cursor.copy(statement + " (FORMAT BINARY)" if binary else statement) as copy:
+        if binary:
+            copy.set_types(["text", "int4", "int4", "int4", "float8"])
+        for city_id, year, value in rows:
+            copy.write_row((load_id, indicator_id, city_id, year, value))
+            count += 1
+    return count
+
+
+def stage_indicator_values(
+    db: Session,
+    load_id: str,
+    indicator_id: int,
+    rows: Iterable[tuple[int, int | None, float]],
+    binary: bool = True,
+) -> int:
+    """COPY `(city_id, year, value)` rows into the staging table. Not committed.
+
+    Returns the number of rows staged.
+    """
+    connection = db.connection()
+    with connection.connection.driver_connection.cursor() as cursor:
+        return _copy_rows(cursor, load_id, indicator_id, rows, binary)
+
+
+def _staged(load_id: str, indicator_id: int) -> sa.Subquery:
+    """One indicator's staged rows, the last staged value per `(city_id, year)`."""
+    stage = StagingIndicatorValue
+    return (
+        sa.select(stage.city_id, stage.year, stage.value)
+        .where(stage.load_id == load_id, stage.indicator_id == indicator_id)
+        .distinct(stage.city_id, stage.year)
+        .order_by(stage.city_id, stage.year, stage.seq.desc())
+        .subquery("v")
+    )
+
+
+def merge_staged_values(db: Session, load_id: str, indicator_id: int) -> LoadStats:
+    """Upsert one indicator's staged rows into `indicator_values`. Not committed.
+
+    Rows repeating a `(city_id, year)` keep the last staged value, like a
+    sequence of single upserts would.
+    """
+    source = _staged(load_id, indicator_id)
+    stats = upsert_indicator_values_from(db, indicator_id, source)
+    staged = db.scalar(sa.select(sa.func.count()).select_from(source))
+    stats.skipped = staged - stats.written
+    return stats
+
+
+def replace_staged_values(db: Session, load_id: str, indicator_id: int) -> LoadStats:
+    """Replace all of one indicator's values with its staged rows. Not committed.
+
+    Empties the indicator's partition and refills it, so other indicators
+    are neither scanned nor locked. DELETE rather than TRUNCATE: TRUNCATE's
+    ACCESS EXCLUSIVE lock would block every read of the indicator until
+    commit, while after a DELETE they keep seeing the old rows. The dead
+    rows are left to autovacuum. Every row counts as inserted.
+    """
+    db.execute(sa.delete(partition_table(indicator_id)))
+    source = _staged(load_id, indicator_id)
+    written = db.execute(
+        sa.insert(IndicatorValue)
+        .from_select(
+            ["city_id", "indicator_id", "year", "value"],
+            sa.select(source.c.city_id, sa.literal(indicator_id, sa.Integer), source.c.year, source.c.value),
+        )
+        .returning(IndicatorValue.city_id, IndicatorValue.year)
+    ).all()
+    stats = LoadStats(inserted=len(written))
+    stats.track(written)
+    return stats
+
+
+def clear_staging(db: Session, load_id: str) -> None:
+    """Drop the staged rows of a load. Not committed."""
+    db.execute(sa.delete(StagingIndicatorValue).where(StagingIndicatorValue.load_id == load_id))
+
+
+def analyze(db: Session, *tables: str) -> None:
+    """Refresh planner statistics, e.g. after a merge. Not committed."""
+    for table in tables:
+        db.execute(sa.text(f"ANALYZE {table}"))
+
+
+def copy_indicator_values(
+    db: Session,
+    indicator_id: int,
+    rows: Iterable[tuple[int, int | None, float]],
+    binary: bool = True,
+) -> LoadStats:
+    """Stage and immediately merge rows for one indicator.
+
+    Drop-in replacement for `upsert_indicator_values` for large batches,
+    running entirely in the caller's transaction (nothing is committed).
+    Loaders that can defer the merge should stage and merge separately.
+    """
+    load_id = new_load_id()
+    if not stage_indicator_values(db, load_id, indicator_id, rows, binary):
+        return LoadStats()
+    analyze(db, StagingIndicatorValue.__tablename__)
+    stats = merge_staged_values(db, load_id, indicator_id)
+    clear_staging(db, load_id)
+    return stats
@@ -0,0 +1,200 @@
+"""Content-addressed disk cache for ETL HTTP downloads.
+
+Bodies are stored once per content hash under `blobs/`, and `index/` maps
+each URL to its current blob plus the validators (ETag / Last-Modified)
+needed for conditional requests. With `offline=True` nothing touches the
+network: every URL is served from the cache or fails with `CacheMiss`.
+
+Layout::
+
+    <root>/index/<sha256(url)>.json
+    <root>/blobs/<sha256[:2]>/<sha256>
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, AsyncIterable, Iterable, Iterator, Mapping
+
+import requests
+
+from app.core.config import settings
+from app.etl.jsonstream import CHUNK_SIZE, read_chunks
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a URL has never been cached."""
+
+    def __init__(self, url: str):
+        super().__init__(f"{url}: not in ETL cache (offline mode)")
+        self.url = url
+        self.reason = "not cached"
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    sha256: str
+    size: int
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: str | None = None
+
+
+class HTTPCache:
+    """Disk cache with conditional revalidation and an offline replay mode."""
+
+    def __init__(self, root: str | Path, offline: bool = False):
+        self.root = Path(root)
+        self.offline = offline
+
+    def _index_path(self, url: str) -> Path:
+        return self.root / "index" / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Return the cached entry for `url` if both index and blob exist."""
+        try:
+            entry = CacheEntry(**json.loads(self._index_path(url).read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry if self.blob_path(entry.sha256).exists() else None
+
+    def require(self, url: str) -> CacheEntry:
+        """Offline lookup: the entry for `url`, or `CacheMiss`."""
+        entry = self.lookup(url)
+        if entry is None:
+            raise CacheMiss(url)
+        return entry
+
+    def open(self, entry: CacheEntry) -> IO[bytes]:
+        return self.blob_path(entry.sha256).open("rb")
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry | None) -> dict[str, str]:
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _begin(self) -> IO[bytes]:
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+
+    def _commit(self, url: str, tmp: IO[bytes], digest: str, headers: Mapping[str, str]) -> CacheEntry:
+        tmp.close()
+        entry = CacheEntry(
+            url=url,
+            sha256=digest,
+            size=os.path.getsize(tmp.name),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            fetched_at=datetime.now(tz=timezone.utc).isoformat(),
+        )
+        blob = self.blob_path(entry.sha256)
+        if blob.exists():
+            os.unlink(tmp.name)  # same content already stored
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp.name, blob)
+
+        index = self._index_path(url)
+        index.parent.mkdir(parents=True, exist_ok=True)
+        tmp_index = index.with_suffix(".tmp")
+        tmp_index.write_text(json.dumps(asdict(entry)))
+        os.replace(tmp_index, index)
+        return entry
+
+    def store(self, url: str, chunks: Iterable[bytes], headers: Mapping[str, str]) -> CacheEntry:
+        """Write a response body to the cache while hashing it."""
+        tmp, digest = self._begin(), hashlib.sha256()
+        try:
+            for chunk in chunks:
+                tmp.write(chunk)
+                digest.update(chunk)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+        return self._commit(url, tmp, digest.hexdigest(), headers)
+
+    async def astore(
+        self, url: str, chunks: AsyncIterable[bytes], headers: Mapping[str, str]
+    ) -> CacheEntry:
+        """Async counterpart of `store`."""
+        tmp, digest = self._begin(), hashlib.sha256()
+        try:
+            async for chunk in chunks:
+                tmp.write(chunk)
+                digest.update(chunk)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+        return self._commit(url, tmp, digest.hexdigest(), headers)
+
+    def fetch(self, url: str) -> CacheEntry:
+        """Return a fresh cache entry for `url`, downloading only if it changed."""
+        entry = self.lookup(url)
+        if self.offline:
+            return self.require(url)
+
+        with requests.get(url, headers=self.conditional_headers(entry), stream=True) as r:
+            if r.status_code == 304 and entry:
+                return entry
+            r.raise_for_status()
+            return self.store(url, r.iter_content(CHUNK_SIZE), r.headers)
+
+
+def default_cache() -> HTTPCache | None:
+    """The cache configured in settings, or None when ETL_CACHE_DIR is empty."""
+    if not settings.ETL_CACHE_DIR:
+        return None
+    return HTTPCache(settings.ETL_CACHE_DIR, offline=settings.ETL_OFFLINE)
+
+
+class Payload:
+    """A response body as an iterable of byte chunks, plus its SHA-256.
+
+    `sha256` is known up front when the body comes from the cache; otherwise
+    it is computed while the chunks are consumed and set once they run out.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], sha256: str | None = None):
+        self._chunks = chunks
+        self.sha256 = sha256
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.sha256:
+            yield from self._chunks
+            return
+        digest = hashlib.sha256()
+        for chunk in self._chunks:
+            digest.update(chunk)
+            yield chunk
+        self.sha256 = digest.hexdigest()
+
+
+@contextmanager
+def stream_url(url: str, cache: HTTPCache | None = None) -> Iterator[Payload]:
+    """Yield the body of `url` as a `Payload`, going through `cache` when given."""
+    if cache:
+        entry = cache.fetch(url)
+        with cache.open(entry) as f:
+            yield Payload(read_chunks(f), entry.sha256)
+    else:
+        with requests.get(url, stream=True) as r:
+            r.raise_for_status()
+            yield Payload(r.iter_content(CHUNK_SIZE))
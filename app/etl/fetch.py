@@ -0,0 +1,290 @@
+"""Async HTTP fetch engine shared by the ETL loaders.
+
+`AsyncFetcher` keeps one pooled keep-alive client, bounds the number of
+requests in flight, rate limits per host and retries transient failures
+with jittered exponential backoff. Jobs that still fail are re-queued for
+another round and, if they fail again, collected in `AsyncFetcher.failed`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import IO, Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.etl.cache import CacheEntry, CacheMiss, HTTPCache
+from app.etl.jsonstream import CHUNK_SIZE
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+
+class FetchError(Exception):
+    """Raised when a URL could not be fetched after all retries."""
+
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+
+@dataclass
+class FetchJob:
+    """A URL to fetch plus a caller-defined key (e.g. a city id)."""
+
+    key: Any
+    url: str
+    error: str | None = None
+    # SHA-256 of the body, set for spooled downloads
+    sha256: str | None = None
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second for each host."""
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def acquire(self, host: str) -> None:
+        if self.rate <= 0:
+            return
+        async with self._locks[host]:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / self.rate)
+                now = time.monotonic()
+                tokens = 1.0
+            self._buckets[host] = (tokens - 1, now)
+
+
+class AsyncFetcher:
+    """Pooled, rate-limited HTTP client with retries and a retry queue.
+
+    Use as an async context manager::
+
+        async with AsyncFetcher() as fetcher:
+            async for job, data in fetcher.fetch_all(jobs):
+                ...
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.ETL_HTTP_CONCURRENCY,
+        rate_per_host: float = settings.ETL_HTTP_RATE_LIMIT,
+        max_retries: int = settings.ETL_HTTP_MAX_RETRIES,
+        rounds: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 60.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: HTTPCache | None = None,
+    ):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.rounds = rounds
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.transport = transport
+        self.cache = cache
+        self.limiter = RateLimiter(rate_per_host)
+        self.failed: list[FetchJob] = []
+        self.client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+            transport=self.transport,
+            follow_redirects=True,
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.client.aclose()
+        self.client = None
+
+    def _delay(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        # Full jitter: spread retries of concurrent failures over the window
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    async def _send(
+        self,
+        url: str,
+        read: Callable[[httpx.Response], Awaitable[T]],
+        headers: dict[str, str] | None = None,
+    ) -> T:
+        """GET `url` and hand the response to `read`, retrying transient failures.
+
+        Connection errors (including ones raised while `read` consumes the
+        body), 429 and 5xx responses are retried; other 4xx fail at once.
+        """
+        host = urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(host)
+            retry_after = None
+            try:
+                async with self.client.stream("GET", url, headers=headers) as response:
+                    if response.status_code in RETRYABLE_STATUS:
+                        reason = f"HTTP {response.status_code}"
+                        retry_after = response.headers.get("Retry-After")
+                    elif response.is_error:
+                        raise FetchError(url, f"HTTP {response.status_code}")
+                    else:
+                        return await read(response)
+            except httpx.TransportError as e:
+                reason = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                raise FetchError(url, reason)
+            await asyncio.sleep(self._delay(attempt, retry_after))
+
+    async def get(self, url: str) -> httpx.Response:
+        """GET `url` with retries and return the fully read response."""
+
+        async def read(response: httpx.Response) -> httpx.Response:
+            await response.aread()
+            return response
+
+        return await self._send(url, read)
+
+    async def get_json(self, url: str) -> Any:
+        if self.cache:
+            with await self.download(url) as f:
+                return json.load(f)
+        response = await self.get(url)
+        return response.json()
+
+    async def download(self, url: str) -> IO[bytes]:
+        """Stream the body of `url` into a spooled temporary file.
+
+        Bodies up to `SPOOL_MAX_MEMORY` stay in memory, larger ones roll over
+        to disk, so big tables never sit decoded in RAM. The caller owns
+        (and must close) the returned file, positioned at its start.
+
+        With a cache the body is stored there instead and the cached blob is
+        returned; unchanged resources are revalidated with a conditional GET,
+        and in offline mode the network is never used.
+        """
+        body, _ = await self.fetch_body(url)
+        return body
+
+    async def fetch_body(self, url: str) -> tuple[IO[bytes], str]:
+        """Like `download`, but also return the SHA-256 of the body."""
+        if self.cache:
+            entry = await self._fetch_cached(url)
+            return self.cache.open(entry), entry.sha256
+
+        async def read(response: httpx.Response) -> tuple[IO[bytes], str]:
+            spool, digest = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY), hashlib.sha256()
+            try:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    spool.write(chunk)
+                    digest.update(chunk)
+            except BaseException:
+                spool.close()
+                raise
+            spool.seek(0)
+            return spool, digest.hexdigest()
+
+        return await self._send(url, read)
+
+    async def _fetch_cached(self, url: str) -> CacheEntry:
+        if self.cache.offline:
+            return self.cache.require(url)
+
+        entry = self.cache.lookup(url)
+
+        async def read(response: httpx.Response) -> CacheEntry:
+            if response.status_code == 304 and entry:
+                return entry
+            return await self.cache.astore(url, response.aiter_bytes(CHUNK_SIZE), response.headers)
+
+        return await self._send(url, read, headers=self.cache.conditional_headers(entry))
+
+    async def fetch_all(
+        self, jobs: Iterable[FetchJob], spool: bool = False
+    ) -> AsyncIterator[tuple[FetchJob, Any]]:
+        """Fetch every job, yielding `(job, data)` as responses arrive.
+
+        `data` is the decoded JSON body, or with `spool=True` the file
+        returned by `download()`, which the consumer must close; the body
+        hash is then available as `job.sha256`. Jobs that
+        fail are retried in a later round; the ones still failing after the
+        last round end up in `self.failed`.
+        """
+        pending = list(jobs)
+        for round_no in range(self.rounds):
+            if not pending:
+                break
+            if round_no:
+                print(f"  Retrying {len(pending)} failed requests...")
+                await asyncio.sleep(self._delay(round_no))
+
+            failed: list[FetchJob] = []
+            async for item in self._run_round(pending, failed, spool):
+                yield item
+            pending = failed
+
+        self.failed.extend(pending)
+
+    async def _run_round(
+        self, jobs: list[FetchJob], failed: list[FetchJob], spool: bool
+    ) -> AsyncIterator[tuple[FetchJob, Any]]:
+        queue: asyncio.Queue[FetchJob] = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        # Bounded so a slow consumer applies backpressure to the workers
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker() -> None:
+            while not queue.empty():
+                job = queue.get_nowait()
+                try:
+                    if spool:
+                        data, job.sha256 = await self.fetch_body(job.url)
+                    else:
+                        data = await self.get_json(job.url)
+                except (FetchError, CacheMiss, ValueError) as e:
+                    job.error = str(e)
+                    failed.append(job)
+                    continue
+                job.error = None
+                await results.put((job, data))
+
+        runner = asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(jobs)))))
+        try:
+            while not (runner.done() and results.empty()):
+                getter = asyncio.ensure_future(results.get())
+                await asyncio.wait({getter, runner}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            # Surface unexpected worker errors instead of swallowing them
+            runner.result()
+        finally:
+            runner.cancel()
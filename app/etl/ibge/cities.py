@@ -1,116 +1,170 @@
 """Load city metadata from IBGE API."""
 
-import requests
+import hashlib
+import json
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import SessionLocal
+from app.etl.bulk import analyze, new_load_id
+from app.etl.cache import default_cache, stream_url
+from app.etl.ibge.common import LoadStats, batched, ensure_indicator, upsert_indicator_values
+from app.etl.jsonstream import iter_json_array
+from app.etl.profiling import track_peak_rss
+from app.etl.watermarks import get_watermark, set_watermark
 from app.models.city import City
-from app.models.indicator import Indicator
-from app.models.indicator_value import IndicatorValue
+from app.models.staging import StagingCity
+
+WATERMARK = "ibge:municipios"
+
+
+def municipios_url() -> str:
+    return f"{settings.IBGE_API_URL}/localidades/municipios"
+
+
+def fingerprint(name: str, uf: str, region: str, area: float | None) -> str:
+    """Short content hash of a city's source fields, to detect unchanged rows."""
+    payload = json.dumps([name, uf, region, area], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def parse_city(item: dict) -> dict:
+    """Map one `localidades/municipios` item to `cities` column values."""
+    uf_obj = item["microrregiao"]["mesorregiao"]["UF"]
+
+    # Try to get area from the item (may not be present)
+    area = item.get("area")
+    if area is not None:
+        try:
+            area = float(area)
+        except (ValueError, TypeError):
+            area = None
+
+    name = item["nome"]
+    uf = uf_obj["sigla"]
+    region = uf_obj["regiao"]["nome"]
+    return {
+        "ibge_id": item["id"],
+        "name": name,
+        "uf": uf,
+        "region": region,
+        "area": area,
+        "fingerprint": fingerprint(name, uf, region, area),
+    }
+
+
+def stage_cities(db: Session, load_id: str, rows: list[dict]) -> None:
+    """Write a batch of parsed cities to the staging table. Not committed."""
+    db.execute(insert(StagingCity), [{**row, "load_id": load_id} for row in rows])
+
+
+def merge_cities(
+    db: Session, load_id: str, full: bool = False
+) -> tuple[list[tuple[int, float | None]], LoadStats]:
+    """Upsert the staged cities into `cities` in one INSERT ... ON CONFLICT (ibge_id).
 
-IBGE_URL = "https://servicodados.ibge.gov.br/api/v1/localidades/municipios"
+    Cities whose fingerprint did not change are left alone unless `full`.
+    Returns `(ids, stats)` where `ids` holds `(city_id, area)` for every
+    inserted or updated city. Not committed.
+    """
+    columns = ["ibge_id", "name", "uf", "region", "area", "fingerprint"]
+    # ON CONFLICT cannot touch the same row twice in one statement: last one wins
+    source = (
+        sa.select(*(getattr(StagingCity, column) for column in columns))
+        .where(StagingCity.load_id == load_id)
+        .distinct(StagingCity.ibge_id)
+        .order_by(StagingCity.ibge_id, StagingCity.seq.desc())
+    )
 
+    stmt = insert(City).from_select(columns, source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[City.ibge_id],
+        set_={
+            "name": stmt.excluded.name,
+            "uf": stmt.excluded.uf,
+            "region": stmt.excluded.region,
+            "area": sa.func.coalesce(stmt.excluded.area, City.area),
+            "fingerprint": stmt.excluded.fingerprint,
+        },
+        where=None if full else City.fingerprint.is_distinct_from(stmt.excluded.fingerprint),
+    ).returning(City.id, City.area, sa.literal_column("xmax = 0").label("inserted"))
 
-def load_cities():
-    """Load cities from IBGE API with upsert logic."""
+    result = db.execute(stmt).all()
+    ids = [(r.id, r.area) for r in result]
+    staged = db.scalar(sa.select(sa.func.count()).select_from(source.subquery()))
+
+    stats = LoadStats(skipped=staged - len(result))
+    stats.inserted = sum(1 for r in result if r.inserted)
+    stats.updated = len(result) - stats.inserted
+    stats.city_ids = {city_id for city_id, _ in ids}
+    return ids, stats
+
+
+def load_cities(full: bool = False) -> LoadStats:
+    """Load cities from IBGE API with upsert logic.
+
+    The payload is staged first and merged into `cities` in one short
+    transaction at the end. Skips the whole load when the payload hash
+    matches the last run's watermark, and unchanged cities otherwise; `full`
+    disables both.
+    """
+    load_id = new_load_id()
     db = SessionLocal()
     try:
         # Ensure AREA indicator exists
-        area_indicator = db.query(Indicator).filter(Indicator.code == "AREA").first()
-        if not area_indicator:
-            area_indicator = Indicator(
-                code="AREA",
-                name="Territorial Area",
-                unit="km²"
-            )
-            db.add(area_indicator)
-            db.commit()
-            db.refresh(area_indicator)
-            print("✓ Created AREA indicator")
-        else:
-            print("✓ AREA indicator already exists")
-        
+        area_indicator = ensure_indicator(db, "AREA", "Territorial Area", "km²")
+        watermark = get_watermark(db, WATERMARK)
+
         print("Fetching cities from IBGE API...")
-        r = requests.get(IBGE_URL)
-        r.raise_for_status()
-        data = r.json()
-        
-        print(f"Processing {len(data)} cities...")
-        loaded = 0
-        updated = 0
-        area_values_created = 0
-        
-        for item in data:
-            ibge_id = item["id"]
-            name = item["nome"]
-            uf = item["microrregiao"]["mesorregiao"]["UF"]["sigla"]
-            region = item["microrregiao"]["mesorregiao"]["UF"]["regiao"]["nome"]
-            
-            # Try to get area from the item (may not be present)
-            area = item.get("area")
-            if area is not None:
-                try:
-                    area = float(area)
-                except (ValueError, TypeError):
-                    area = None
-            
-            # Upsert logic
-            city = db.query(City).filter(City.ibge_id == ibge_id).first()
-            if city:
-                # Update existing city
-                city.name = name
-                city.uf = uf
-                city.region = region
-                if area is not None:
-                    city.area = area
-                updated += 1
-            else:
-                # Create new city
-                city = City(
-                    ibge_id=ibge_id,
-                    name=name,
-                    uf=uf,
-                    region=region,
-                    area=area
-                )
-                db.add(city)
-                loaded += 1
-            
-            # Commit to get city.id
-            db.flush()
-            
-            # Create/update AREA indicator value if area is available
-            if area is not None and area > 0:
-                area_value = db.query(IndicatorValue).filter(
-                    IndicatorValue.city_id == city.id,
-                    IndicatorValue.indicator_id == area_indicator.id,
-                    IndicatorValue.year.is_(None)
-                ).first()
-                
-                if area_value:
-                    area_value.value = area
-                else:
-                    area_value = IndicatorValue(
-                        city_id=city.id,
-                        indicator_id=area_indicator.id,
-                        year=None,
-                        value=area
-                    )
-                    db.add(area_value)
-                    area_values_created += 1
-        
+        area_stats = LoadStats()
+
+        with track_peak_rss() as memory, stream_url(municipios_url(), default_cache()) as payload:
+            if not full and watermark and payload.sha256 and payload.sha256 == watermark.payload_hash:
+                print("✓ Municipality list unchanged since last run, nothing to load")
+                return LoadStats()
+
+            # Parse the payload item by item and stage it as it arrives
+            items = iter_json_array(payload)
+            for batch in batched(parse_city(item) for item in items):
+                stage_cities(db, load_id, batch)
+                db.commit()
+
+        # Short final transaction: merge cities and their AREA values
+        analyze(db, StagingCity.__tablename__)
+        ids, city_stats = merge_cities(db, load_id, full)
+        area_rows = [(city_id, None, area) for city_id, area in ids if area is not None and area > 0]
+        for batch in batched(area_rows):
+            area_stats.add(upsert_indicator_values(db, area_indicator.id, batch))
+        set_watermark(db, WATERMARK, payload_hash=payload.sha256)
         db.commit()
-        print(f"✓ Loaded {loaded} new cities, updated {updated} existing cities")
-        print(f"✓ Created/updated {area_values_created} AREA indicator values")
-        return loaded + updated
+        if city_stats.written:
+            analyze(db, City.__tablename__)
+            db.commit()
+
+        print(
+            f"✓ Loaded {city_stats.inserted} new cities, updated {city_stats.updated} existing cities, "
+            f"skipped {city_stats.skipped} unchanged"
+        )
+        print(f"✓ Created/updated {area_stats.written} AREA indicator values")
+        print(f"✓ Peak memory: {memory}")
+        return city_stats.add(area_stats)
     except Exception as e:
         db.rollback()
         print(f"✗ Error loading cities: {e}")
         raise
     finally:
-        db.close()
+        try:
+            db.execute(sa.delete(StagingCity).where(StagingCity.load_id == load_id))
+            db.commit()
+        except Exception as e:
+            # Do not hide the load's own error (e.g. a lost connection)
+            print(f"✗ Could not clear staged cities of load {load_id}: {e}")
+        finally:
+            db.close()
 
 
 if __name__ == "__main__":
     load_cities()
-
@@ -0,0 +1,196 @@
+"""Shared helpers for the IBGE loaders."""
+
+import asyncio
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import AsyncIterable, Callable, Iterable, Iterator, Sequence, TypeVar
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import Session
+
+from app.models.indicator import Indicator
+from app.models.indicator_value import partition_table
+
+T = TypeVar("T")
+
+BATCH_SIZE = 1000
+
+# IBGE numeric code -> UF acronym, used for per-state SIDRA queries (n3)
+UF_CODES = {
+    11: "RO", 12: "AC", 13: "AM", 14: "RR", 15: "PA", 16: "AP", 17: "TO",
+    21: "MA", 22: "PI", 23: "CE", 24: "RN", 25: "PB", 26: "PE", 27: "AL", 28: "SE", 29: "BA",
+    31: "MG", 32: "ES", 33: "RJ", 35: "SP",
+    41: "PR", 42: "SC", 43: "RS",
+    50: "MS", 51: "MT", 52: "GO", 53: "DF",
+}
+
+
+@dataclass
+class LoadStats:
+    """Row counts for one load, the cities and years it changed, and what failed."""
+
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    city_ids: set[int] = field(default_factory=set)
+    years: set[int] = field(default_factory=set)
+    # Fetch jobs still failing after the last retry round
+    failed: list = field(default_factory=list)
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated
+
+    def add(self, other: "LoadStats") -> "LoadStats":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.city_ids |= other.city_ids
+        self.years |= other.years
+        self.failed.extend(other.failed)
+        return self
+
+    def track(self, keys: Iterable[tuple[int, int | None]]) -> None:
+        """Record `(city_id, year)` pairs that were written."""
+        for city_id, year in keys:
+            self.city_ids.add(city_id)
+            if year is not None:
+                self.years.add(year)
+
+
+def batched(iterable: Iterable[T], size: int = BATCH_SIZE) -> Iterator[list[T]]:
+    """Yield lists of at most `size` items from `iterable`."""
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def ensure_indicator(db: Session, code: str, name: str, unit: str) -> Indicator:
+    """Return the indicator with `code`, creating it if needed."""
+    indicator = db.query(Indicator).filter(Indicator.code == code).first()
+    if not indicator:
+        indicator = Indicator(code=code, name=name, unit=unit)
+        db.add(indicator)
+        db.commit()
+        db.refresh(indicator)
+        print(f"✓ Created {code} indicator")
+    else:
+        print(f"✓ {code} indicator already exists")
+    return indicator
+
+
+def upsert_indicator_values_from(
+    db: Session,
+    indicator_id: int,
+    source: sa.FromClause,
+) -> LoadStats:
+    """Upsert one indicator's values from a selectable with `city_id`, `year`, `value`.
+
+    Runs a single INSERT ... SELECT ... ON CONFLICT on the
+    `(city_id, indicator_id, year)` key; rows whose value is unchanged are
+    not touched. `year` may be None for static indicators (the key treats
+    NULL years as equal). `source` must hold at most one row per
+    `(city_id, year)`.
+    """
+    # Writing to the indicator's partition directly skips tuple routing and
+    # allows RETURNING xmax, which the partitioned parent does not
+    partition = partition_table(indicator_id)
+    stmt = insert(partition).from_select(
+        ["city_id", "indicator_id", "year", "value"],
+        sa.select(
+            source.c.city_id,
+            sa.literal(indicator_id, sa.Integer),
+            source.c.year,
+            source.c.value,
+        ),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["city_id", "indicator_id", "year"],
+        set_={"value": stmt.excluded.value},
+        where=partition.c.value.is_distinct_from(stmt.excluded.value),
+    ).returning(
+        partition.c.city_id,
+        partition.c.year,
+        sa.literal_column("xmax = 0").label("inserted"),
+    )
+    written = db.execute(stmt).all()
+
+    stats = LoadStats()
+    stats.inserted = sum(1 for row in written if row.inserted)
+    stats.updated = len(written) - stats.inserted
+    stats.track((row.city_id, row.year) for row in written)
+    return stats
+
+
+def upsert_indicator_values(
+    db: Session,
+    indicator_id: int,
+    rows: Sequence[tuple[int, int | None, float]],
+) -> LoadStats:
+    """Upsert `(city_id, year, value)` rows for one indicator.
+
+    Each column is sent as a single array and expanded with unnest(), so a
+    batch costs one statement regardless of its size.
+    """
+    if not rows:
+        return LoadStats()
+
+    city_ids, years, values = zip(*rows)
+    v = (
+        sa.func.unnest(
+            sa.cast(sa.bindparam("city_ids", list(city_ids)), ARRAY(sa.Integer)),
+            sa.cast(sa.bindparam("years", list(years)), ARRAY(sa.Integer)),
+            sa.cast(sa.bindparam("values", list(values)), ARRAY(sa.Float)),
+        )
+        .table_valued("city_id", "year", "value")
+        .render_derived(name="v")
+    )
+    stats = upsert_indicator_values_from(db, indicator_id, v)
+    stats.skipped = len(rows) - stats.written
+    return stats
+
+
+async def write_batches(
+    rows: AsyncIterable[T],
+    write: Callable[[list[T]], LoadStats],
+    size: int = BATCH_SIZE,
+) -> LoadStats:
+    """Drain an async stream of rows into `write`, `size` rows at a time.
+
+    `write` is a blocking function (usually an upsert) returning its
+    `LoadStats`. It runs in a worker thread, one batch at a time, while the
+    producer keeps going. Returns the combined stats.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+    errors: list[BaseException] = []
+
+    async def writer() -> LoadStats:
+        stats = LoadStats()
+        while (batch := await queue.get()) is not None:
+            # Keep draining after a failure so the producer never blocks on put()
+            if errors:
+                continue
+            try:
+                stats.add(await asyncio.to_thread(write, batch))
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+        return stats
+
+    writer_task = asyncio.create_task(writer())
+    batch: list[T] = []
+    try:
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                await queue.put(batch)
+                batch = []
+                if errors:
+                    break
+        if batch and not errors:
+            await queue.put(batch)
+    finally:
+        await queue.put(None)
+    return await writer_task
@@ -1,112 +1,100 @@
 """Compute and load population density (POP / AREA)."""
 
-from sqlalchemy.orm import Session
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
 
 from app.db.session import SessionLocal
+from app.etl.ibge.common import LoadStats, ensure_indicator, upsert_indicator_values_from
 from app.models.city import City
 from app.models.indicator import Indicator
 from app.models.indicator_value import IndicatorValue
 
 
-def load_density():
-    """Compute density = population / area for all cities and years."""
+def load_density(city_ids: set[int] | None = None) -> LoadStats:
+    """Compute density = population / area for all cities and years.
+
+    With `city_ids`, only those cities are recomputed (e.g. the ones whose
+    area or population changed in this run); an empty set is a no-op.
+    """
     db = SessionLocal()
     try:
         # Ensure DENSITY indicator exists
-        density_indicator = db.query(Indicator).filter(Indicator.code == "DENSITY").first()
-        if not density_indicator:
-            density_indicator = Indicator(
-                code="DENSITY",
-                name="Population Density",
-                unit="people/km²"
-            )
-            db.add(density_indicator)
-            db.commit()
-            db.refresh(density_indicator)
-            print("✓ Created DENSITY indicator")
-        else:
-            print("✓ DENSITY indicator already exists")
-        
+        density_indicator = ensure_indicator(db, "DENSITY", "Population Density", "people/km²")
+
         # Ensure AREA indicator exists (for consistency)
-        area_indicator = db.query(Indicator).filter(Indicator.code == "AREA").first()
-        if not area_indicator:
-            area_indicator = Indicator(
-                code="AREA",
-                name="Territorial Area",
-                unit="km²"
-            )
-            db.add(area_indicator)
-            db.commit()
-            db.refresh(area_indicator)
-            print("✓ Created AREA indicator")
-        else:
-            print("✓ AREA indicator already exists")
-        
+        area_indicator = ensure_indicator(db, "AREA", "Territorial Area", "km²")
+
         # Get POP indicator
         pop_indicator = db.query(Indicator).filter(Indicator.code == "POP").first()
         if not pop_indicator:
             print("✗ POP indicator not found. Please run population loader first.")
-            return 0
-        
+            return LoadStats()
+
+        if city_ids is not None and not city_ids:
+            print("✓ No city changed since last run, density is up to date")
+            return LoadStats()
+
+        def scoped(query, column):
+            if city_ids is None:
+                return query
+            return query.where(column.in_(sorted(city_ids)))
+
         print("Computing density values...")
-        loaded = 0
-        updated = 0
-        
-        # Get all cities with area
-        cities = db.query(City).filter(City.area.isnot(None), City.area > 0).all()
-        
-        for city in cities:
-            # Get all population values for this city
-            pop_values = db.query(IndicatorValue).filter(
-                IndicatorValue.city_id == city.id,
-                IndicatorValue.indicator_id == pop_indicator.id
-            ).all()
-            
-            # Also ensure AREA value exists for this city
-            area_value = db.query(IndicatorValue).filter(
-                IndicatorValue.city_id == city.id,
-                IndicatorValue.indicator_id == area_indicator.id,
-                IndicatorValue.year.is_(None)
-            ).first()
-            
-            if not area_value:
-                area_value = IndicatorValue(
-                    city_id=city.id,
-                    indicator_id=area_indicator.id,
-                    year=None,
-                    value=city.area
+
+        # Also ensure an AREA value exists for every city with area
+        area_source = scoped(
+            sa.select(
+                City.id.label("city_id"),
+                sa.null().cast(sa.Integer).label("year"),
+                City.area.label("value"),
+            ).where(City.area > 0),
+            City.id,
+        ).subquery("a")
+        db.execute(
+            insert(IndicatorValue)
+            .from_select(
+                ["city_id", "indicator_id", "year", "value"],
+                sa.select(
+                    area_source.c.city_id,
+                    sa.literal(area_indicator.id, sa.Integer),
+                    area_source.c.year,
+                    area_source.c.value,
+                ),
+            )
+            .on_conflict_do_nothing(
+                index_elements=[IndicatorValue.city_id, IndicatorValue.indicator_id, IndicatorValue.year]
+            )
+        )
+
+        # Join every non-zero POP value with its city's area, one row per (city, year)
+        density_source = (
+            scoped(
+                sa.select(
+                    IndicatorValue.city_id,
+                    IndicatorValue.year,
+                    (IndicatorValue.value / City.area).label("value"),
                 )
-                db.add(area_value)
-                db.commit()
-            
-            # Compute density for each year with population data
-            for pop_value in pop_values:
-                if pop_value.value and city.area:
-                    density = pop_value.value / city.area
-                    
-                    # Check if density value already exists
-                    existing = db.query(IndicatorValue).filter(
-                        IndicatorValue.city_id == city.id,
-                        IndicatorValue.indicator_id == density_indicator.id,
-                        IndicatorValue.year == pop_value.year
-                    ).first()
-                    
-                    if existing:
-                        existing.value = density
-                        updated += 1
-                    else:
-                        density_value = IndicatorValue(
-                            city_id=city.id,
-                            indicator_id=density_indicator.id,
-                            year=pop_value.year,
-                            value=density
-                        )
-                        db.add(density_value)
-                        loaded += 1
-        
+                .join(City, City.id == IndicatorValue.city_id)
+                .where(
+                    IndicatorValue.indicator_id == pop_indicator.id,
+                    IndicatorValue.value != 0,
+                    City.area > 0,
+                ),
+                IndicatorValue.city_id,
+            )
+            .distinct(IndicatorValue.city_id, IndicatorValue.year)
+            .order_by(IndicatorValue.city_id, IndicatorValue.year, IndicatorValue.id.desc())
+            .subquery("d")
+        )
+        stats = upsert_indicator_values_from(db, density_indicator.id, density_source)
+        stats.skipped = db.scalar(sa.select(sa.func.count()).select_from(density_source)) - stats.written
+
         db.commit()
-        print(f"✓ Loaded {loaded} new density values, updated {updated} existing values")
-        return loaded + updated
+        print(
+            f"✓ Loaded {stats.inserted} new density values, updated {stats.updated} existing values, "
+            f"skipped {stats.skipped} unchanged"
+        )
+        return stats
     except Exception as e:
         db.rollback()
         print(f"✗ Error computing density: {e}")
@@ -117,4 +105,3 @@ def load_density():
 
 if __name__ == "__main__":
     load_density()
-
@@ -1,17 +1,16 @@
-import requests
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
+from app.etl.cache import default_cache, stream_url
+from app.etl.ibge.cities import municipios_url
+from app.etl.jsonstream import iter_json_array
 from app.models.city import City
 
-IBGE_URL = "https://servicodados.ibge.gov.br/api/v1/localidades/municipios"
-
 
 def run():
     print("📥 Baixando lista de municípios do IBGE...")
 
-    r = requests.get(IBGE_URL)
-    r.raise_for_status()
-    data = r.json()
+    with stream_url(municipios_url(), default_cache()) as payload:
+        data = list(iter_json_array(payload))
 
     db: Session = SessionLocal()
 
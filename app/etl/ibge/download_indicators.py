@@ -1,10 +1,47 @@
 """Download and load indicator data from IBGE SIDRA API."""
 
-import requests
+import asyncio
+
+from app.core.config import settings
 from app.db.session import SessionLocal
+from app.etl.bulk import COPY_BATCH_SIZE, copy_indicator_values
+from app.etl.cache import default_cache
+from app.etl.fetch import AsyncFetcher, FetchJob
+from app.etl.ibge.common import LoadStats, write_batches
 from app.models.city import City
 from app.models.indicator import Indicator
-from app.models.indicator_value import IndicatorValue
+
+
+def sidra_city_url(ibge_id: int) -> str:
+    return f"{settings.SIDRA_API_URL}/values/t/6579/n6/{ibge_id}"
+
+
+def parse_rows(city_id: int, data: list[dict]) -> list[tuple[int, int, float]]:
+    """Turn one city's SIDRA response into `(city_id, year, value)` rows."""
+    rows = []
+    # Skip header row (first row)
+    for row in data[1:]:
+        try:
+            rows.append((city_id, int(row["D3C"]), float(row["V"])))
+        except (ValueError, KeyError) as e:
+            print(f"Error processing row for city {city_id}: {e}")
+    return rows
+
+
+async def fetch_population(
+    db, indicator_id: int, cities: list[City], fetcher: AsyncFetcher
+) -> LoadStats:
+    """Fetch every city concurrently and stream the rows to the DB in batches."""
+    jobs = [FetchJob(key=city.id, url=sidra_city_url(city.ibge_id)) for city in cities]
+
+    async def rows():
+        async for job, data in fetcher.fetch_all(jobs):
+            for row in parse_rows(job.key, data):
+                yield row
+
+    return await write_batches(
+        rows(), lambda batch: copy_indicator_values(db, indicator_id, batch), size=COPY_BATCH_SIZE
+    )
 
 
 def load_population():
@@ -20,41 +57,25 @@ def load_population():
             db.refresh(pop)
         else:
             db.refresh(pop)
-        
+
         cities = db.query(City).all()
-        total_loaded = 0
-        
-        for city in cities:
-            url = f"https://apisidra.ibge.gov.br/values/t/6579/n6/{city.ibge_id}"
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                data = response.json()
-                
-                # Skip header row (first row)
-                for row in data[1:]:
-                    try:
-                        year = int(row["D3C"])
-                        value = float(row["V"])
-                        
-                        indicator_value = IndicatorValue(
-                            city_id=city.id,
-                            indicator_id=pop.id,
-                            year=year,
-                            value=value
-                        )
-                        db.add(indicator_value)
-                        total_loaded += 1
-                    except (ValueError, KeyError) as e:
-                        print(f"Error processing row for city {city.id}: {e}")
-                        continue
-                
-            except requests.RequestException as e:
-                print(f"Error fetching data for city {city.id} (IBGE {city.ibge_id}): {e}")
-                continue
-        
+        fetcher = AsyncFetcher(cache=default_cache())
+
+        async def run() -> LoadStats:
+            async with fetcher:
+                return await fetch_population(db, pop.id, cities, fetcher)
+
+        stats = asyncio.run(run())
         db.commit()
-        print(f"Loaded {total_loaded} population indicator values")
+        print(f"Loaded {stats.written} population indicator values, skipped {stats.skipped} unchanged")
+
+        # Returned to the caller, which decides whether the load is complete
+        stats.failed = list(fetcher.failed)
+        if stats.failed:
+            print(f"✗ Failed to fetch {len(stats.failed)} cities after retries:")
+            for job in stats.failed:
+                print(f"  city {job.key}: {job.error}")
+        return stats
     except Exception as e:
         db.rollback()
         print(f"Error loading population data: {e}")
@@ -65,4 +86,3 @@ def load_population():
 
 if __name__ == "__main__":
     load_population()
-
@@ -0,0 +1,17 @@
+"""SIDRA indicators loaded by the ETL.
+
+Adding an indicator only takes a new entry here: the table, the variable
+and any classification filters needed to get one value per municipality
+and year. Every entry is loaded by `load_sidra` in the `sidra` ETL step.
+"""
+
+from app.etl.ibge.sidra import SidraIndicator
+
+SIDRA_INDICATORS = [
+    # Estimativas de população (resident population estimate)
+    SidraIndicator(code="POP", name="Population", unit="people", table=6579, variable=93),
+    # Produto interno bruto dos municípios, at current prices
+    SidraIndicator(code="GDP", name="Gross Domestic Product", unit="R$ 1,000", table=5938, variable=37),
+]
+
+INDICATORS = {indicator.code: indicator for indicator in SIDRA_INDICATORS}
@@ -0,0 +1,290 @@
+"""Generic loader for municipal SIDRA tables.
+
+Each indicator is declared as a `SidraIndicator` (see `registry.py`). All
+requested indicators go through one pipeline: their per-UF shards are
+fetched together by a single `AsyncFetcher`, parsed as they arrive and
+staged with COPY, so adding tables adds requests to the same pool instead
+of another sequential pass. The serving table is only written by the
+final merge.
+"""
+
+import asyncio
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, Iterator, NamedTuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.etl.bulk import (
+    COPY_BATCH_SIZE,
+    analyze,
+    clear_staging,
+    merge_staged_values,
+    new_load_id,
+    replace_staged_values,
+    stage_indicator_values,
+)
+from app.etl.cache import default_cache
+from app.etl.fetch import AsyncFetcher, FetchJob
+from app.etl.ibge.common import UF_CODES, LoadStats, ensure_indicator, write_batches
+from app.etl.jsonstream import iter_json_array, read_chunks
+from app.etl.profiling import track_peak_rss
+from app.etl.watermarks import get_watermarks, set_watermark
+from app.models.city import City
+from app.models.indicator_value import IndicatorValue
+from app.models.staging import StagingIndicatorValue
+
+WATERMARK = "sidra"
+
+# SIDRA placeholders for values that are missing, zero by rounding or confidential
+MISSING_VALUES = {"", "-", "..", "...", "X"}
+
+
+@dataclass
+class SidraIndicator:
+    """One indicator read from a SIDRA table at municipality level."""
+
+    code: str  # Indicator.code
+    name: str
+    unit: str
+    table: int
+    variable: int
+    # Classification id -> category ids, e.g. {2: "6794"} for "total" sex
+    classifications: dict[int, str] = field(default_factory=dict)
+
+    def url(self, uf_code: int, period: str = "all") -> str:
+        """SIDRA query for every municipality (n6) inside one UF (n3)."""
+        classifications = "".join(f"/c{c}/{cats}" for c, cats in self.classifications.items())
+        return (
+            f"{settings.SIDRA_API_URL}/values/t/{self.table}/n6/in n3 {uf_code}"
+            f"/v/{self.variable}/p/{period}{classifications}"
+        )
+
+    def shards(self, periods: list[str] | None = None) -> list[FetchJob]:
+        """One job per UF, or per UF and period when `periods` is given."""
+        return [
+            FetchJob(key=(self.code, UF_CODES[uf_code], period), url=self.url(uf_code, period))
+            for uf_code in UF_CODES
+            for period in (periods or ["all"])
+        ]
+
+
+class SidraRow(NamedTuple):
+    ibge_id: int
+    year: int
+    value: float
+
+
+def _columns(header: dict) -> tuple[str, str]:
+    """Find the municipality and year code columns from SIDRA's header row."""
+    city_key, year_key = "D1C", "D3C"
+    for key, label in header.items():
+        if not (key.startswith("D") and key.endswith("C")):
+            continue
+        if label.startswith("Município"):
+            city_key = key
+        elif label.startswith("Ano"):
+            year_key = key
+    return city_key, year_key
+
+
+def parse_row(row: dict, city_key: str = "D1C", year_key: str = "D3C") -> SidraRow | None:
+    """Parse one SIDRA row into `(ibge_id, year, value)`, or None if incomplete."""
+    ibge_id_str = row.get(city_key, "")
+    year_str = row.get(year_key, "")
+    value_str = row.get("V", "")
+
+    if not ibge_id_str or not year_str or value_str in MISSING_VALUES:
+        return None
+
+    return SidraRow(int(ibge_id_str), int(year_str), float(value_str))
+
+
+def iter_rows(chunks: Iterable[bytes]) -> Iterator[SidraRow]:
+    """Parse a SIDRA response body, given as byte chunks, row by row."""
+    items = iter_json_array(chunks)
+    # The first row is a header naming each column
+    header = next(items, None) or {}
+    city_key, year_key = _columns(header)
+    for row in items:
+        try:
+            parsed = parse_row(row, city_key, year_key)
+        except (ValueError, KeyError) as e:
+            print(f"  Warning: Error processing row: {e}")
+            continue
+        if parsed:
+            yield parsed
+
+
+def shard_watermark(job: FetchJob) -> str:
+    code, uf, period = job.key
+    return f"{WATERMARK}:{code}:{uf}:{period}"
+
+
+def cities_digests(ibge_ids: Iterable[int]) -> dict[str, str]:
+    """Hash of the loaded municipalities of each UF, keyed by UF acronym."""
+    by_uf = defaultdict(list)
+    for ibge_id in ibge_ids:
+        # The first two digits of a municipality code are its UF code
+        uf = UF_CODES.get(ibge_id // 100000)
+        if uf:
+            by_uf[uf].append(ibge_id)
+    return {
+        uf: hashlib.sha256(",".join(map(str, sorted(ids))).encode()).hexdigest()
+        for uf, ids in by_uf.items()
+    }
+
+
+def shard_fingerprint(payload_hash: str | None, cities_digest: str | None) -> str:
+    """Watermark hash of a shard: its payload and the cities its rows can go to.
+
+    Rows of cities that are not loaded are dropped, so a shard has to be
+    parsed again when a city is added to its UF, even if IBGE did not
+    change the payload.
+    """
+    return hashlib.sha256(f"{payload_hash}:{cities_digest}".encode()).hexdigest()
+
+
+async def stream_sidra(
+    fetcher: AsyncFetcher,
+    jobs: list[FetchJob],
+    seen: dict[str, tuple[str, str | None]],
+    changed: dict[str, tuple[str, int]],
+    stats: LoadStats,
+    cities: dict[str, str] | None = None,
+) -> AsyncIterator[tuple[str, SidraRow]]:
+    """Fetch every shard in parallel and merge their rows into one stream.
+
+    Yields `(indicator code, row)`. Bodies are spooled and parsed
+    incrementally, so memory stays flat however large a shard is. Shards
+    whose fingerprint (body hash plus `cities[uf]`, see `shard_fingerprint`)
+    equals `seen[watermark]` are not parsed (their stored row count goes to
+    `stats.skipped`); the others are reported in `changed` as
+    `watermark -> (fingerprint, rows)`.
+    """
+    cities = cities or {}
+    done = 0
+    async for job, body in fetcher.fetch_all(jobs, spool=True):
+        done += 1
+        code, uf, period = job.key
+        source = shard_watermark(job)
+        with body:
+            fingerprint = shard_fingerprint(job.sha256, cities.get(uf))
+            last_hash, last_count = seen.get(source, (None, None))
+            if fingerprint == last_hash:
+                stats.skipped += int(last_count or 0)
+                print(f"  ✓ Shard {done}/{len(jobs)} {code} {uf} (p/{period}): unchanged")
+                continue
+            count = 0
+            for row in iter_rows(read_chunks(body)):
+                count += 1
+                yield code, row
+        changed[source] = (fingerprint, count)
+        print(f"  ✓ Shard {done}/{len(jobs)} {code} {uf} (p/{period}): {count} records")
+
+
+def load_sidra(
+    indicators: Iterable[SidraIndicator],
+    periods: list[str] | None = None,
+    full: bool = False,
+) -> LoadStats:
+    """Load the given SIDRA indicators together.
+
+    Rows are staged first and merged into `indicator_values` in one short
+    transaction at the end. Shards whose payload is unchanged since the last
+    run are skipped, as are values equal to the stored ones; `full`
+    re-parses every shard and, when every period was fetched without a
+    failed shard, replaces each indicator's partition outright instead of
+    merging into it.
+    """
+    indicators = list(indicators)
+    load_id = new_load_id()
+    db = SessionLocal()
+    try:
+        indicator_ids = {
+            ind.code: ensure_indicator(db, ind.code, ind.name, ind.unit).id for ind in indicators
+        }
+
+        # Create a mapping of ibge_id to city_id for faster lookups
+        cities_map = dict(db.query(City.ibge_id, City.id).all())
+
+        seen = {} if full else {
+            source: (mark.payload_hash, mark.value)
+            for source, mark in get_watermarks(db, f"{WATERMARK}:").items()
+        }
+        jobs = [job for ind in indicators for job in ind.shards(periods)]
+        changed: dict[str, tuple[str, int]] = {}
+        latest_year: dict[str, int] = {}
+        staged: set[str] = set()
+        stats = LoadStats()
+
+        def write(batch: list[tuple[str, SidraRow]]) -> LoadStats:
+            by_indicator = defaultdict(list)
+            for code, (ibge_id, year, value) in batch:
+                # Skip rows whose city is not loaded
+                if ibge_id in cities_map:
+                    by_indicator[code].append((cities_map[ibge_id], year, value))
+                    latest_year[code] = max(year, latest_year.get(code, year))
+            for code, rows in by_indicator.items():
+                stage_indicator_values(db, load_id, indicator_ids[code], rows)
+                staged.add(code)
+            # Staging commits only hold locks on the staging table
+            db.commit()
+            return LoadStats()
+
+        async def run() -> list[FetchJob]:
+            async with AsyncFetcher(cache=default_cache()) as fetcher:
+                rows = stream_sidra(fetcher, jobs, seen, changed, stats, cities_digests(cities_map))
+                await write_batches(rows, write, size=COPY_BATCH_SIZE)
+                failed = fetcher.failed
+            if failed:
+                print(f"✗ {len(failed)} shards failed after retries:")
+                for job in failed:
+                    code, uf, period = job.key
+                    print(f"  {code} {uf} (p/{period}): {job.error}")
+            return failed
+
+        codes = ", ".join(indicator_ids)
+        print(f"Fetching {codes} from IBGE SIDRA ({len(jobs)} shards)...")
+        with track_peak_rss() as memory:
+            failed = asyncio.run(run())
+
+        # A complete fresh copy of an indicator replaces its partition
+        replace = full and periods is None and not failed
+        merge = replace_staged_values if replace else merge_staged_values
+
+        # Short final transaction: merge what was staged, watermark the shards
+        if staged:
+            print("Replacing staged indicators..." if replace else "Merging staged values...")
+            analyze(db, StagingIndicatorValue.__tablename__)
+        for code in staged:
+            stats.add(merge(db, load_id, indicator_ids[code]))
+        for source, (sha256, count) in changed.items():
+            set_watermark(db, source, payload_hash=sha256, value=str(count))
+        for code, year in latest_year.items():
+            set_watermark(db, f"{WATERMARK}:{code}", value=str(year))
+        db.commit()
+        stats.failed = failed
+        if stats.written:
+            analyze(db, IndicatorValue.__tablename__)
+            db.commit()
+        print(
+            f"✓ Loaded {stats.inserted} new {codes} values, updated {stats.updated} existing values, "
+            f"skipped {stats.skipped} unchanged"
+        )
+        print(f"✓ Peak memory: {memory}")
+        return stats
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Error loading SIDRA data: {e}")
+        raise
+    finally:
+        try:
+            clear_staging(db, load_id)
+            db.commit()
+        except Exception as e:
+            # Do not hide the load's own error (e.g. a lost connection)
+            print(f"✗ Could not clear staged values of load {load_id}: {e}")
+        finally:
+            db.close()
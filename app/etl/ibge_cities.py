@@ -4,12 +4,21 @@ from __future__ import annotations
 
 import csv
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable
 
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import Session
 
-from models.city import City
+from app.etl.ibge.cities import WATERMARK as MUNICIPIOS_WATERMARK
+from app.etl.ibge.common import batched
+from app.etl.views import rebuild_city_snapshots
+from app.etl.watermarks import bump_dataset_version, clear_watermark, get_watermark, set_watermark
+from app.models.city import City
+
+CHUNK_SIZE = 5000
 
 
 @dataclass(frozen=True)
@@ -47,33 +56,114 @@ def read_ibge_csv(path: Path) -> Iterable[IBGECityRecord]:
             yield IBGECityRecord.from_dict(row)
 
 
-def load_ibge_cities(db: Session, records: Iterable[IBGECityRecord]) -> int:
-    """Persist the provided records to the database.
+def _upsert_chunk(db: Session, chunk: list[IBGECityRecord]) -> int:
+    # ON CONFLICT cannot touch the same row twice in one statement: last one wins
+    latest = list({record.ibge_code: record for record in chunk}.values())
+    values = {
+        "ibge_id": [int(record.ibge_code) for record in latest],
+        "name": [record.name for record in latest],
+        "uf": [record.state for record in latest],
+        "region": [record.region or None for record in latest],
+    }
+    # One array per column expanded with unnest(), so the statement stays small
+    source = sa.select(
+        sa.func.unnest(
+            *(
+                sa.cast(sa.bindparam(column, column_values), ARRAY(City.__table__.c[column].type))
+                for column, column_values in values.items()
+            )
+        )
+        .table_valued(*values)
+        .render_derived(name="v")
+    )
+    stmt = insert(City).from_select(list(values), source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[City.ibge_id],
+        set_={
+            "name": stmt.excluded.name,
+            "uf": stmt.excluded.uf,
+            "region": stmt.excluded.region,
+            # Make the next IBGE API load rewrite these cities (see also
+            # load_ibge_cities, which drops the API payload watermark)
+            "fingerprint": None,
+        },
+    )
+    return len(db.execute(stmt.returning(City.id)).all())
+
+
+def load_ibge_cities(
+    db: Session,
+    records: Iterable[IBGECityRecord],
+    chunk_size: int = CHUNK_SIZE,
+    start: int = 0,
+    on_chunk: Callable[[Session, int], None] | None = None,
+) -> int:
+    """Persist the provided records to the database, one chunk at a time.
+
+    Each chunk of `chunk_size` records is upserted with a single
+    INSERT ... ON CONFLICT (ibge_id) and committed on its own, so memory
+    stays constant however long `records` is. The first `start` records are
+    skipped, which resumes an interrupted load; `on_chunk(db, offset)` runs
+    inside each chunk's transaction with the offset reached, to persist it.
+    Coordinates are not stored: `cities` has no columns for them.
+
+    The IBGE API load's payload watermark is dropped with each chunk, so its
+    next run does not skip an unchanged payload and rewrites these cities.
+    At the end, city snapshots are rebuilt and a new dataset version is
+    published, so the API stops serving the previous names.
 
     Returns the number of inserted or updated cities.
     """
 
     count = 0
-    for record in records:
-        city = db.query(City).filter(City.ibge_code == record.ibge_code).one_or_none()
-        if city is None:
-            city = City(
-                name=record.name,
-                state=record.state,
-                region=record.region or None,
-                ibge_code=record.ibge_code,
-                latitude=record.latitude,
-                longitude=record.longitude,
-            )
-            db.add(city)
-            count += 1
-        else:
-            city.name = record.name
-            city.state = record.state
-            city.region = record.region or None
-            city.latitude = record.latitude
-            city.longitude = record.longitude
-    db.commit()
+    offset = start
+    for chunk in batched(islice(records, start, None), chunk_size):
+        count += _upsert_chunk(db, chunk)
+        clear_watermark(db, MUNICIPIOS_WATERMARK)
+        offset += len(chunk)
+        if on_chunk:
+            on_chunk(db, offset)
+        db.commit()
+    if count:
+        rebuild_city_snapshots()
+        bump_dataset_version(db)
+        db.commit()
     return count
 
 
+def load_ibge_csv(
+    db: Session, path: Path, chunk_size: int = CHUNK_SIZE, resume: bool = True
+) -> int:
+    """Load a city CSV, resuming from the last committed chunk of the same file.
+
+    The offset is kept in `etl_watermarks` alongside the file's size and
+    modification time; a different file starts over from the first row.
+    """
+
+    source = f"csv:{path.resolve()}"
+    stat = path.stat()
+    identity = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    start = 0
+    watermark = get_watermark(db, source)
+    if resume and watermark and watermark.payload_hash == identity and watermark.value:
+        start = int(watermark.value)
+        print(f"Resuming {path.name} at row {start}")
+
+    def checkpoint(db: Session, offset: int) -> None:
+        set_watermark(db, source, payload_hash=identity, value=str(offset))
+
+    return load_ibge_cities(db, read_ibge_csv(path), chunk_size, start, checkpoint)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        loaded = load_ibge_csv(session, Path(sys.argv[1]), resume="--restart" not in sys.argv[2:])
+        print(f"✓ Loaded {loaded} cities")
+    finally:
+        session.close()
@@ -0,0 +1,109 @@
+"""Incremental decoding of large top-level JSON arrays.
+
+IBGE and SIDRA answer with one JSON array of flat-ish objects. Decoding the
+whole body with `json.loads` materialises every item at once; the parser
+below yields items one by one while only buffering the bytes of the item
+currently being read.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import IO, Any, AsyncIterable, AsyncIterator, Iterable, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = " \t\n\r,]"
+
+
+class JSONArrayParser:
+    """Push parser: `feed()` bytes in, get the completed array items out."""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        # start -> first (after "[") -> sep (after an item) -> value (after ",") -> end
+        self._state = "start"
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        self._buf += self._utf8.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> list[Any]:
+        """Flush the remaining buffer; raises ValueError if the array is incomplete."""
+        self._buf += self._utf8.decode(b"", final=True)
+        items = self._drain(final=True)
+        if self._state != "end":
+            raise ValueError("Truncated JSON array")
+        return items
+
+    def _drain(self, final: bool) -> list[Any]:
+        buf, pos, items = self._buf, 0, []
+        while True:
+            pos = _WS.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            char = buf[pos]
+
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                self._state = "first"
+                pos += 1
+            elif self._state == "sep":
+                if char == ",":
+                    self._state = "value"
+                elif char == "]":
+                    self._state = "end"
+                else:
+                    raise ValueError(f"Expected ',' or ']' at offset {pos}, got {char!r}")
+                pos += 1
+            elif self._state in ("first", "value"):
+                if char == "]" and self._state == "first":
+                    self._state = "end"
+                    pos += 1
+                    continue
+                try:
+                    item, end = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break  # item not fully buffered yet
+                if not final and (end == len(buf) or buf[end] not in _DELIMITERS):
+                    break  # a number cut mid-chunk ("2" of "2.5") may continue
+                items.append(item)
+                self._state = "sep"
+                pos = end
+            else:
+                raise ValueError(f"Unexpected data after JSON array at offset {pos}")
+
+        self._buf = buf[pos:]
+        return items
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the items of a JSON array delivered as an iterable of byte chunks."""
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Async counterpart of `iter_json_array`."""
+    parser = JSONArrayParser()
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
+
+
+def read_chunks(f: IO[bytes], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a binary file object in fixed-size chunks."""
+    while chunk := f.read(size):
+        yield chunk
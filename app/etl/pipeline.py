@@ -0,0 +1,231 @@
+"""Dependency-driven ETL orchestrator.
+
+A pipeline is a list of `Step`s, each naming the steps it depends on. Steps
+whose dependencies are done run in parallel worker threads. Every step
+attempt is checkpointed in `etl_step_runs`, so when a run fails the next one
+resumes it: steps already done in that run are not executed again.
+
+Declaring a new loader only takes a new node::
+
+    Step("gdp", lambda ctx: load_gdp(full=ctx.full), deps=("cities",))
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.session import SessionLocal
+from app.etl.ibge.common import LoadStats
+from app.models.etl_step_run import EtlStepRun
+
+
+@dataclass
+class StepContext:
+    """What a step gets to see of the run it belongs to."""
+
+    full: bool
+    # Stats of the steps that finished in this process; steps done in an
+    # earlier attempt of a resumed run are absent
+    results: dict[str, LoadStats] = field(default_factory=dict)
+
+    def changed_city_ids(self, *steps: str) -> set[int] | None:
+        """Cities changed by `steps`, or None when that is unknown (full or resumed run)."""
+        if self.full or any(step not in self.results for step in steps):
+            return None
+        city_ids: set[int] = set()
+        for step in steps:
+            city_ids |= self.results[step].city_ids
+        return city_ids
+
+
+@dataclass
+class Step:
+    name: str
+    run: Callable[[StepContext], LoadStats]
+    deps: Sequence[str] = ()
+
+
+@dataclass
+class StepReport:
+    step: str
+    status: str
+    seconds: float = 0.0
+    stats: LoadStats | None = None
+    error: str | None = None
+
+    @property
+    def rows(self) -> int:
+        return self.stats.written + self.stats.skipped if self.stats else 0
+
+    @property
+    def throughput(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class PipelineError(Exception):
+    """Raised when one or more steps failed; the run can be resumed."""
+
+    def __init__(self, run_id: str, failed: list[str]):
+        super().__init__(f"ETL run {run_id} failed at: {', '.join(failed)}")
+        self.run_id = run_id
+        self.failed = failed
+
+
+class Pipeline:
+    def __init__(self, steps: Sequence[Step], max_workers: int = 4):
+        self.steps = {step.name: step for step in steps}
+        self.max_workers = max_workers
+        for step in steps:
+            for dep in step.deps:
+                if dep not in self.steps:
+                    raise ValueError(f"Step {step.name!r} depends on unknown step {dep!r}")
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        state: dict[str, str] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle through step {name!r}")
+            state[name] = "visiting"
+            for dep in self.steps[name].deps:
+                visit(dep)
+            state[name] = "done"
+
+        for name in self.steps:
+            visit(name)
+
+    def _resumable_run(self, db) -> tuple[str, set[str]] | None:
+        """The latest run if some step in it did not finish, with its done steps."""
+        run_id = db.scalar(
+            sa.select(EtlStepRun.run_id).order_by(EtlStepRun.started_at.desc()).limit(1)
+        )
+        if run_id is None:
+            return None
+        statuses = dict(
+            db.execute(
+                sa.select(EtlStepRun.step, EtlStepRun.status).where(EtlStepRun.run_id == run_id)
+            ).all()
+        )
+        done = {step for step, status in statuses.items() if status == "done"}
+        if set(self.steps) <= done:
+            return None
+        return run_id, done
+
+    def _checkpoint(self, run_id: str, step: str, **values) -> None:
+        db = SessionLocal()
+        try:
+            stmt = insert(EtlStepRun).values(run_id=run_id, step=step, **values)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    constraint="uq_etl_step_runs_run_step",
+                    set_={key: stmt.excluded[key] for key in values},
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _run_step(self, run_id: str, step: Step, ctx: StepContext) -> StepReport:
+        self._checkpoint(
+            run_id, step.name, status="running", started_at=sa.func.now(),
+            finished_at=None, seconds=None, rows_written=None, rows_skipped=None, error=None,
+        )
+        start = time.perf_counter()
+        try:
+            stats = step.run(ctx) or LoadStats()
+        except Exception as e:
+            report = StepReport(step.name, "failed", time.perf_counter() - start, error=str(e))
+        else:
+            report = StepReport(step.name, "done", time.perf_counter() - start, stats)
+            if stats.failed:
+                # Loaded what it could, but incomplete: keep dependents (and
+                # publish) from running, and retry the step on the next run
+                report.status = "failed"
+                report.error = f"{len(stats.failed)} fetches still failing after retries"
+
+        self._checkpoint(
+            run_id,
+            step.name,
+            status=report.status,
+            finished_at=datetime.now(tz=timezone.utc),
+            seconds=report.seconds,
+            rows_written=report.stats.written if report.stats else None,
+            rows_skipped=report.stats.skipped if report.stats else None,
+            error=report.error,
+        )
+        return report
+
+    def run(self, full: bool = False, resume: bool = True) -> list[StepReport]:
+        """Run every step not yet done, in dependency order and in parallel.
+
+        With `resume`, an unfinished previous run is continued under the same
+        run id instead of starting over. Raises `PipelineError` if any step
+        fails; the steps that depend on it are not started.
+        """
+        db = SessionLocal()
+        try:
+            previous = self._resumable_run(db) if resume else None
+        finally:
+            db.close()
+
+        if previous:
+            run_id, done = previous
+            print(f"Resuming ETL run {run_id} (already done: {', '.join(sorted(done)) or 'none'})")
+        else:
+            run_id, done = uuid.uuid4().hex, set()
+            print(f"Starting ETL run {run_id}")
+
+        ctx = StepContext(full=full)
+        reports = [StepReport(name, "resumed") for name in self.steps if name in done]
+        failed: list[str] = []
+        running: dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                if not failed:
+                    for step in self.steps.values():
+                        started = step.name in done or step.name in running.values()
+                        if not started and all(dep in done for dep in step.deps):
+                            print(f"▶ {step.name}")
+                            running[pool.submit(self._run_step, run_id, step, ctx)] = step.name
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    report = future.result()
+                    reports.append(report)
+                    if report.status == "done":
+                        done.add(name)
+                        ctx.results[name] = report.stats
+                        print(f"✓ {name} finished in {report.seconds:.1f}s")
+                    else:
+                        failed.append(name)
+                        print(f"✗ {name} failed after {report.seconds:.1f}s: {report.error}")
+
+        print_reports(reports)
+        if failed:
+            raise PipelineError(run_id, failed)
+        return reports
+
+
+def print_reports(reports: list[StepReport]) -> None:
+    print(f"{'step':<16}{'status':<10}{'time':>9}{'rows':>10}{'written':>10}{'rows/s':>11}")
+    for r in reports:
+        written = r.stats.written if r.stats else 0
+        print(
+            f"{r.step:<16}{r.status:<10}{r.seconds:>8.1f}s{r.rows:>10}{written:>10}"
+            f"{r.throughput:>11.0f}"
+        )
@@ -0,0 +1,86 @@
+"""Lightweight resource probes for ETL stages."""
+
+from __future__ import annotations
+
+import resource
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass
+class MemoryUsage:
+    """Peak resident set size observed while a stage ran."""
+
+    peak_bytes: int = 0
+    # Another tracked stage ran at the same time: the peak is the whole
+    # process's since the first of them started
+    overlapped: bool = False
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / 2**20
+
+    def __str__(self) -> str:
+        note = " (process-wide, other steps ran meanwhile)" if self.overlapped else ""
+        return f"{self.peak_mb:.1f} MB{note}"
+
+
+# Stages tracked right now, and how many have started so far. The high-water
+# mark is process-wide, so it is only reset when no other stage is tracked.
+_lock = threading.Lock()
+_active = 0
+_started = 0
+
+
+def _reset_peak_rss() -> None:
+    # Linux lets a process reset its RSS high-water mark (VmHWM); elsewhere the
+    # peak is process-wide and only ever grows.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def track_peak_rss() -> Iterator[MemoryUsage]:
+    """Measure the peak RSS of the enclosed block.
+
+    Pipeline steps run in parallel threads of one process: when tracked
+    blocks overlap, none of them resets the peak under the others and each
+    reports the process peak, flagged as `overlapped`.
+    """
+    global _active, _started
+    usage = MemoryUsage()
+    with _lock:
+        if _active:
+            usage.overlapped = True
+        else:
+            _reset_peak_rss()
+        _active += 1
+        _started += 1
+        started = _started
+    try:
+        yield usage
+    finally:
+        with _lock:
+            _active -= 1
+            if _started != started:
+                usage.overlapped = True
+            usage.peak_bytes = _peak_rss()
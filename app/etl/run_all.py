@@ -1,36 +1,88 @@
-"""Management command to run all ETL scripts."""
+"""Management command to run all ETL scripts.
 
+Usage: python -m app.etl.run_all [--full] [--restart]
+
+`--full` reloads everything instead of skipping unchanged data; `--restart`
+starts a new run instead of resuming a failed one.
+"""
+
+import sys
+
+from app.db.session import SessionLocal
 from app.etl.ibge.cities import load_cities
-from app.etl.ibge.population import load_population
 from app.etl.ibge.density import load_density
+from app.etl.ibge.registry import SIDRA_INDICATORS
+from app.etl.ibge.sidra import load_sidra
+from app.etl.pipeline import Pipeline, PipelineError, Step, StepContext
+from app.etl.views import rebuild_city_snapshots, refresh_latest_values
+from app.etl.watermarks import bump_dataset_version
+
+
+def run_density(ctx: StepContext):
+    # Only recompute the cities touched upstream in this run
+    return load_density(ctx.changed_city_ids("cities", "sidra"))
+
+
+def run_refresh(ctx: StepContext):
+    # Skip when the loaders of this run changed nothing
+    if ctx.changed_city_ids("cities", "sidra", "density") == set():
+        print("✓ No city changed since last run, latest values are up to date")
+        return None
+    return refresh_latest_values()
+
+
+def run_snapshots(ctx: StepContext):
+    # Only rebuild the cities touched in this run (and any still missing)
+    return rebuild_city_snapshots(ctx.changed_city_ids("cities", "sidra", "density"))
 
 
-def main():
-    """Run all ETL loaders in sequence."""
+def run_publish(ctx: StepContext):
+    # A new dataset version tells the API to rebuild its indexes and caches
+    if ctx.changed_city_ids("cities", "sidra", "density") == set():
+        print("✓ No city changed since last run, dataset version kept")
+        return None
+    db = SessionLocal()
+    try:
+        version = bump_dataset_version(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"✓ Published dataset version {version}")
+    return None
+
+
+STEPS = [
+    Step("cities", lambda ctx: load_cities(full=ctx.full)),
+    # Every indicator in the SIDRA registry, fetched through one shared pipeline
+    Step("sidra", lambda ctx: load_sidra(SIDRA_INDICATORS, full=ctx.full), deps=("cities",)),
+    Step("density", run_density, deps=("cities", "sidra")),
+    # Last: read models derived from the loaded values
+    Step("refresh", run_refresh, deps=("cities", "sidra", "density")),
+    Step("snapshots", run_snapshots, deps=("cities", "sidra", "density")),
+    Step("publish", run_publish, deps=("refresh", "snapshots")),
+]
+
+
+def main(full: bool = False, resume: bool = True):
+    """Run the ETL pipeline, steps in parallel where their dependencies allow."""
     print("=" * 60)
     print("CityScope ETL Pipeline - IBGE Data Loading")
     print("=" * 60)
     print()
-    
-    # Step 1: Load cities
-    print("Step 1: Loading cities...")
-    load_cities()
-    print()
-    
-    # Step 2: Load population
-    print("Step 2: Loading population data...")
-    load_population()
-    print()
-    
-    # Step 3: Compute density
-    print("Step 3: Computing density values...")
-    load_density()
+
+    try:
+        Pipeline(STEPS).run(full=full, resume=resume)
+    except PipelineError as e:
+        print()
+        print(f"✗ {e}; run again to resume from the failed step")
+        sys.exit(1)
+
     print()
-    
     print("=" * 60)
     print("✓ ETL process completed successfully!")
     print("=" * 60)
 
 
 if __name__ == "__main__":
-    main()
+    args = sys.argv[1:]
+    main(full="--full" in args, resume="--restart" not in args)
@@ -0,0 +1,156 @@
+"""Read models derived from `indicator_values`, rebuilt at the end of the ETL.
+
+- `latest_indicator_values`: materialized view of each city's latest value
+  per indicator, refreshed as a whole.
+- `city_snapshot`: one row per city with its indicators packed as JSONB,
+  rebuilt only for the cities a run changed.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by, insert
+
+from app.db.session import SessionLocal
+from app.etl.ibge.common import LoadStats
+from app.models.city import City
+from app.models.city_snapshot import CitySnapshot
+from app.models.indicator import Indicator
+from app.models.indicator_value import IndicatorValue
+from app.models.latest_indicator_value import LatestIndicatorValue
+
+# Years of each indicator kept in a snapshot's `series`
+SNAPSHOT_SERIES_YEARS = 10
+
+
+def refresh_latest_values() -> LoadStats:
+    """Refresh `latest_indicator_values` without blocking readers.
+
+    CONCURRENTLY diffs the new contents against the old ones, so API reads
+    keep using the previous snapshot until the refresh commits.
+    """
+    db = SessionLocal()
+    try:
+        print("Refreshing latest indicator values...")
+        db.execute(sa.text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {LatestIndicatorValue.__tablename__}"))
+        db.commit()
+        print("✓ Refreshed latest indicator values")
+        return LoadStats()
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Error refreshing latest indicator values: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def _snapshot_source(scope: sa.ColumnElement[bool]) -> sa.Select:
+    """City columns plus the packed `indicators` document, for cities in `scope`."""
+    ranked = (
+        sa.select(
+            IndicatorValue.city_id,
+            IndicatorValue.indicator_id,
+            IndicatorValue.year,
+            IndicatorValue.value,
+            sa.func.row_number()
+            .over(
+                partition_by=(IndicatorValue.city_id, IndicatorValue.indicator_id),
+                order_by=IndicatorValue.year.desc().nullslast(),
+            )
+            .label("n"),
+        )
+        .where(IndicatorValue.city_id.in_(sa.select(City.id).where(scope)))
+        .subquery("r")
+    )
+    point = sa.func.jsonb_build_object("year", ranked.c.year, "value", ranked.c.value)
+    series = (
+        sa.select(
+            ranked.c.city_id,
+            ranked.c.indicator_id,
+            sa.func.jsonb_agg(aggregate_order_by(point, ranked.c.year.asc().nullsfirst())).label("series"),
+            # n = 1 is the latest year
+            sa.func.jsonb_agg(point).filter(ranked.c.n == 1).op("->")(0).label("latest"),
+        )
+        .where(ranked.c.n <= SNAPSHOT_SERIES_YEARS)
+        .group_by(ranked.c.city_id, ranked.c.indicator_id)
+        .subquery("s")
+    )
+    document = (
+        sa.select(
+            series.c.city_id,
+            sa.func.jsonb_agg(
+                aggregate_order_by(
+                    sa.func.jsonb_build_object(
+                        "code", Indicator.code,
+                        "name", Indicator.name,
+                        "unit", Indicator.unit,
+                        "latest", series.c.latest,
+                        "series", series.c.series,
+                    ),
+                    Indicator.code,
+                )
+            ).label("indicators"),
+        )
+        .join(Indicator, Indicator.id == series.c.indicator_id)
+        .group_by(series.c.city_id)
+        .subquery("d")
+    )
+    return (
+        sa.select(
+            City.id,
+            City.name,
+            City.uf,
+            City.region,
+            City.area,
+            sa.func.coalesce(document.c.indicators, sa.cast("[]", JSONB)),
+        )
+        .outerjoin(document, document.c.city_id == City.id)
+        .where(scope)
+    )
+
+
+def rebuild_city_snapshots(city_ids: set[int] | None = None) -> LoadStats:
+    """Rebuild `city_snapshot` rows from `cities` and `indicator_values`.
+
+    With `city_ids`, only those cities are rebuilt, plus any city that has
+    no snapshot yet; None rebuilds every city. Rows whose content did not
+    change are left alone.
+    """
+    db = SessionLocal()
+    try:
+        scope = sa.true()
+        if city_ids is not None:
+            missing = ~sa.exists().where(CitySnapshot.city_id == City.id)
+            scope = sa.or_(City.id.in_(sorted(city_ids)), missing) if city_ids else missing
+
+        print("Rebuilding city snapshots...")
+        columns = ["city_id", "name", "uf", "region", "area", "indicators"]
+        stmt = insert(CitySnapshot).from_select(columns, _snapshot_source(scope))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CitySnapshot.city_id],
+            set_={
+                **{column: stmt.excluded[column] for column in columns[1:]},
+                "updated_at": sa.func.now(),
+            },
+            where=sa.tuple_(*(CitySnapshot.__table__.c[column] for column in columns[1:])).is_distinct_from(
+                sa.tuple_(*(stmt.excluded[column] for column in columns[1:]))
+            ),
+        ).returning(CitySnapshot.city_id, sa.literal_column("xmax = 0").label("inserted"))
+        written = db.execute(stmt).all()
+        db.commit()
+
+        stats = LoadStats()
+        stats.inserted = sum(1 for row in written if row.inserted)
+        stats.updated = len(written) - stats.inserted
+        stats.city_ids = {row.city_id for row in written}
+        print(f"✓ Rebuilt {stats.inserted} new and {stats.updated} changed city snapshots")
+        return stats
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Error rebuilding city snapshots: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    refresh_latest_values()
+    rebuild_city_snapshots()
@@ -0,0 +1,56 @@
+"""Per-source ETL watermarks stored in `etl_watermarks`.
+
+The `dataset:version` row is not tied to a source: the ETL bumps it after a
+run that changed data, and the API watches it to drop in-process indexes
+and caches built from the previous data.
+"""
+
+import uuid
+
+import sqlalchemy as sa
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.models.etl_watermark import EtlWatermark
+
+DATASET_VERSION = "dataset:version"
+
+
+def get_watermarks(db: Session, prefix: str) -> dict[str, EtlWatermark]:
+    """Return the watermarks whose source starts with `prefix`, keyed by source."""
+    rows = db.query(EtlWatermark).filter(EtlWatermark.source.startswith(prefix)).all()
+    return {row.source: row for row in rows}
+
+
+def get_watermark(db: Session, source: str) -> EtlWatermark | None:
+    return db.get(EtlWatermark, source)
+
+
+def set_watermark(
+    db: Session, source: str, payload_hash: str | None = None, value: str | None = None
+) -> None:
+    """Upsert a watermark; None arguments keep the stored value. Not committed."""
+    stmt = insert(EtlWatermark).values(source=source, payload_hash=payload_hash, value=value)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EtlWatermark.source],
+        set_={
+            "payload_hash": func.coalesce(stmt.excluded.payload_hash, EtlWatermark.payload_hash),
+            "value": func.coalesce(stmt.excluded.value, EtlWatermark.value),
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def clear_watermark(db: Session, source: str) -> None:
+    """Forget a source's watermark, so its next load starts from scratch. Not committed."""
+    db.execute(sa.delete(EtlWatermark).where(EtlWatermark.source == source))
+
+
+def bump_dataset_version(db: Session) -> str:
+    """Give the served dataset a new version and return it. Not committed."""
+    version = uuid.uuid4().hex
+    set_watermark(db, DATASET_VERSION, value=version)
+    return version
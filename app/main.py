@@ -1,10 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.cache import cache
+from app.core.city_index import city_index
 from app.core.config import settings
+from app.core.dataset import dataset
+from app.core.deps import get_current_user
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine, read_router
 from app.routers import auth, cities, indicators, states
 
-app = FastAPI(title="CityScope API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build in-process indexes now, and again whenever the ETL publishes
+    dataset.on_change(city_index.rebuild)
+    dataset.on_change(cache.invalidate)
+    await dataset.start()
+    yield
+    await dataset.stop()
+    await cache.close()
+    await read_router.dispose()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="CityScope API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 app.include_router(auth.router)
@@ -25,3 +49,17 @@ def healthz():
     return {"ok": True}
 
 
+@app.get("/metrics/pool", dependencies=[Depends(get_current_user)])
+def pool_metrics():
+    """Connection pool saturation, for dashboards and latency investigations."""
+    return {
+        "async": pool_status(async_engine.pool),
+        "sync": pool_status(engine.pool),
+        "read": read_router.status(),
+    }
+
+
+@app.get("/metrics/cache", dependencies=[Depends(get_current_user)])
+def cache_metrics():
+    """Hit/miss counters of the response and auth cache."""
+    return cache.stats()
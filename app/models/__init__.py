@@ -1,13 +1,24 @@
 """SQLAlchemy models for the CityScope backend."""
 
 from app.models.city import City
+from app.models.city_snapshot import CitySnapshot
+from app.models.etl_step_run import EtlStepRun
+from app.models.etl_watermark import EtlWatermark
 from app.models.indicator import Indicator
 from app.models.indicator_value import IndicatorValue
+from app.models.latest_indicator_value import LatestIndicatorValue
+from app.models.staging import StagingCity, StagingIndicatorValue
 from app.models.user import User
 
 __all__ = [
     "City",
+    "CitySnapshot",
+    "EtlStepRun",
+    "EtlWatermark",
     "Indicator",
     "IndicatorValue",
+    "LatestIndicatorValue",
+    "StagingCity",
+    "StagingIndicatorValue",
     "User",
 ]
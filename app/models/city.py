@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Index, Integer, String, Float
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -6,12 +6,20 @@ from app.db.base import Base
 
 class City(Base):
     __tablename__ = "cities"
+    __table_args__ = (
+        # GET /cities sort key (keyset pagination); also serves uf filters.
+        # INCLUDE (region) makes its pages index-only scans.
+        Index("ix_cities_uf_name_id", "uf", "name", "id", postgresql_include=["region"]),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     ibge_id = Column(Integer, unique=True, index=True)   # IBGE official ID
-    name = Column(String, index=True)
-    uf = Column(String(2), index=True)
+    # NOT NULL: both are in the keyset pagination sort key, where a NULL
+    # would fall out of the row comparison of the next-page cursor
+    name = Column(String, index=True, nullable=False)
+    uf = Column(String(2), nullable=False)
     region = Column(String, index=True, nullable=True)
     area = Column(Float, nullable=True)  # Area in km²
+    fingerprint = Column(String(16), nullable=True)  # Hash of the source row, to skip unchanged ones
 
     indicators = relationship("IndicatorValue", back_populates="city")
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class CitySnapshot(Base):
+    """Read model behind GET /cities/{city_id}/details, rebuilt by the ETL.
+
+    `indicators` is a list of
+    `{code, name, unit, latest: {year, value}, series: [{year, value}, ...]}`,
+    with the most recent years of each indicator in `series`.
+    """
+
+    __tablename__ = "city_snapshot"
+
+    city_id = Column(Integer, ForeignKey("cities.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String)
+    uf = Column(String(2))
+    region = Column(String, nullable=True)
+    area = Column(Float, nullable=True)
+    indicators = Column(JSONB, nullable=False, server_default="[]")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class EtlStepRun(Base):
+    __tablename__ = "etl_step_runs"
+    __table_args__ = (UniqueConstraint("run_id", "step", name="uq_etl_step_runs_run_step"),)
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(String(32), nullable=False, index=True)
+    step = Column(String, nullable=False)
+    status = Column(String(16), nullable=False)  # "running", "done" or "failed"
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    seconds = Column(Float, nullable=True)  # wall time
+    rows_written = Column(Integer, nullable=True)
+    rows_skipped = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
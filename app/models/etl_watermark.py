@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class EtlWatermark(Base):
+    __tablename__ = "etl_watermarks"
+
+    source = Column(String, primary_key=True)  # e.g. "ibge:municipios", "sidra:6579:SP"
+    value = Column(String, nullable=True)  # e.g. last SIDRA period loaded
+    payload_hash = Column(String(64), nullable=True)  # SHA-256 of the last payload loaded
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
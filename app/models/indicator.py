@@ -7,7 +7,7 @@ from app.db.base import Base
 class Indicator(Base):
     __tablename__ = "indicators"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     code = Column(String, index=True)       # IBGE table code (SIDRA)
     name = Column(String, index=True)
     unit = Column(String, nullable=True)
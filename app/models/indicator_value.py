@@ -1,18 +1,61 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index, column, table
+from sqlalchemy.sql.expression import TableClause
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
+# indicator_values is LIST-partitioned by indicator_id, one partition per
+# indicator named `indicator_values_<indicator id>`. Partitions are created
+# by a trigger on `indicators` (see migration df4c133382ae), so they are not
+# declared here.
+PARTITION_PREFIX = "indicator_values_"
+
+
+def partition_name(indicator_id: int) -> str:
+    """Name of the partition holding one indicator's values."""
+    return f"{PARTITION_PREFIX}{int(indicator_id)}"
+
+
+def partition_table(indicator_id: int) -> TableClause:
+    """Lightweight table construct for writing to one indicator's partition."""
+    return table(
+        partition_name(indicator_id),
+        column("id", Integer),
+        column("city_id", Integer),
+        column("indicator_id", Integer),
+        column("year", Integer),
+        column("value", Float),
+    )
+
+
+def is_partition(table_name: str) -> bool:
+    suffix = table_name.removeprefix(PARTITION_PREFIX)
+    return suffix != table_name and suffix.isdigit()
+
 
 class IndicatorValue(Base):
     __tablename__ = "indicator_values"
+    __table_args__ = (
+        # Upsert key; NULL years (static indicators) count as equal. INCLUDE
+        # (value) lets per-city reads run as index-only scans.
+        Index(
+            "uq_indicator_values_city_indicator_year",
+            "city_id",
+            "indicator_id",
+            "year",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+            postgresql_include=["value"],
+        ),
+        {"postgresql_partition_by": "LIST (indicator_id)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     city_id = Column(Integer, ForeignKey("cities.id"))
-    indicator_id = Column(Integer, ForeignKey("indicators.id"))
+    # Partition key, so it has to be part of the primary key
+    indicator_id = Column(Integer, ForeignKey("indicators.id"), primary_key=True)
     year = Column(Integer, nullable=True)  # Nullable for static indicators like AREA
     value = Column(Float)
 
     city = relationship("City", back_populates="indicators")
     indicator = relationship("Indicator", back_populates="values")
-
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Float, Integer
+
+from app.db.base import Base
+
+
+class LatestIndicatorValue(Base):
+    """Latest value per (city, indicator): the `latest_indicator_values` materialized view.
+
+    Read-only. The view is created by a migration (autogenerate skips models
+    flagged `is_view`) and refreshed by the last ETL step.
+    """
+
+    __tablename__ = "latest_indicator_values"
+    __table_args__ = {"info": {"is_view": True}}
+
+    city_id = Column(Integer, primary_key=True)
+    indicator_id = Column(Integer, primary_key=True)
+    year = Column(Integer, nullable=True)  # NULL for static indicators like AREA
+    value = Column(Float)
@@ -0,0 +1,40 @@
+from sqlalchemy import BigInteger, Column, Float, Index, Integer, String
+
+from app.db.base import Base
+
+# UNLOGGED: staging rows are scratch data, written without WAL and lost on a
+# crash, which only means the load has to be run again.
+
+
+class StagingCity(Base):
+    __tablename__ = "staging_cities"
+    __table_args__ = (
+        # Merges and clean-ups select one load's rows while others may be staged
+        Index("ix_staging_cities_load_id", "load_id"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    seq = Column(BigInteger, primary_key=True)  # load order, last row wins
+    load_id = Column(String(32), nullable=False)
+    ibge_id = Column(Integer, nullable=False)
+    name = Column(String)
+    uf = Column(String(2))
+    region = Column(String, nullable=True)
+    area = Column(Float, nullable=True)
+    fingerprint = Column(String(16), nullable=True)
+
+
+class StagingIndicatorValue(Base):
+    __tablename__ = "staging_indicator_values"
+    __table_args__ = (
+        # A load stages several indicators; each is merged on its own
+        Index("ix_staging_indicator_values_load_id_indicator_id", "load_id", "indicator_id"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    seq = Column(BigInteger, primary_key=True)  # load order, last row wins
+    load_id = Column(String(32), nullable=False)
+    indicator_id = Column(Integer, nullable=False)
+    city_id = Column(Integer, nullable=False)
+    year = Column(Integer, nullable=True)
+    value = Column(Float)
@@ -1,77 +1,145 @@
 """City endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_current_user
-from app.db.session import get_db
+from app.core.cache import cached
+from app.core.city_index import city_index
+from app.core.dataset import dataset
+from app.core.deps import get_current_user, get_token_subject
+from app.core.http_cache import dataset_etag
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.db.session import get_async_db, get_read_db
+from app.etl.watermarks import bump_dataset_version
 from app.models.city import City
+from app.models.city_snapshot import CitySnapshot
 from app.schemas.city import CityCreate, CityRead
 
-
 router = APIRouter(prefix="/cities", tags=["cities"])
 
+MAX_PAGE_SIZE = 500
+
 
-@router.get("")
-def get_cities(
-    page: int = 1,
-    limit: int = 50,
+@router.get("", dependencies=[Depends(get_token_subject), Depends(dataset_etag)])
+async def get_cities(
+    response: Response,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
     uf: str | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
     user=Depends(get_current_user),
 ):
-    """Get cities with pagination."""
-    skip = (page - 1) * limit
-    q = db.query(City)
+    """Get cities ordered by UF and name, a page at a time.
+
+    Pass the `X-Next-Cursor` header of a response as `cursor` to get the
+    next page; the header is absent on the last page. Cursor pages cost the
+    same however deep they are (`page` still works but skips rows with
+    OFFSET).
+    """
+    sort_key = (City.uf, City.name, City.id)
+    q = select(City.id, City.name, City.uf, City.region)
     if uf:
-        q = q.filter(City.uf == uf.upper())
-    cities = q.order_by(City.uf, City.name).offset(skip).limit(limit).all()
+        q = q.where(City.uf == uf.upper())
+    if cursor:
+        # Seek past the last row of the previous page on ix_cities_uf_name_id
+        q = q.where(tuple_(*sort_key) > tuple(decode_cursor(cursor, (str, str, int))))
+    else:
+        q = q.offset((page - 1) * limit)
+    cities = (await db.execute(q.order_by(*sort_key).limit(limit))).all()
+    if cities and len(cities) == limit:
+        last = cities[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.uf, last.name, last.id)
     return [{"id": c.id, "name": c.name, "uf": c.uf, "region": c.region} for c in cities]
 
 
+@router.get("/search", dependencies=[Depends(get_token_subject), Depends(dataset_etag)])
+def search_cities(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    uf: str | None = None,
+    user=Depends(get_current_user),
+):
+    """Autocomplete cities by name, accent-insensitive, most populous first."""
+    # Served from the in-process index; only the user lookup, usually
+    # answered by the cache, may reach the DB
+    return [
+        {"id": c.id, "name": c.name, "uf": c.uf, "population": c.population}
+        for c in city_index.search(q, limit, uf)
+    ]
+
+
 @router.get("/debug/token")
-def debug_token(user=Depends(get_current_user)):
+async def debug_token(user=Depends(get_current_user)):
     return {"message": "OK", "user": user.email}
 
 
-@router.get("/{city_id}/details")
-def get_city_details(
+@router.get("/{city_id}/details", dependencies=[Depends(get_token_subject), Depends(dataset_etag)])
+@cached()
+async def get_city_details(
     city_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user=Depends(get_current_user),
 ):
     """Get detailed information for a specific city."""
-    # Query city with LEFT OUTER JOIN to indicator_values
-    city = db.query(City).filter(City.id == city_id).first()
-    
-    if not city:
-        raise HTTPException(status_code=404, detail=f"City with id {city_id} not found")
-    
-    # Get indicators (LEFT OUTER JOIN is handled by the relationship)
-    # For now, return empty list as per requirements
-    indicators = []
-    
+    # One primary-key lookup: the ETL keeps city_snapshot up to date
+    snapshot = await db.get(CitySnapshot, city_id)
+
+    if not snapshot:
+        # Cities added since the last snapshots step have no snapshot yet
+        city = await db.get(City, city_id)
+        if not city:
+            raise HTTPException(status_code=404, detail=f"City with id {city_id} not found")
+        return {
+            "id": city.id,
+            "name": city.name,
+            "uf": city.uf,
+            "region": city.region,
+            "area": city.area,
+            "indicators": [],
+        }
+
     return {
-        "id": city.id,
-        "name": city.name,
-        "uf": city.uf,
-        "region": city.region,
-        "area": city.area,
-        "indicators": indicators,
+        "id": snapshot.city_id,
+        "name": snapshot.name,
+        "uf": snapshot.uf,
+        "region": snapshot.region,
+        "area": snapshot.area,
+        "indicators": snapshot.indicators,
     }
 
 
 @router.post("", response_model=CityRead, status_code=status.HTTP_201_CREATED)
-def create_city(city: CityCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def create_city(
+    city: CityCreate, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)
+):
     """Create a new city record."""
     # Verifica se já existe cidade com mesmo IBGE
-    existing = db.query(City).filter(City.ibge_code == city.ibge_code).first()
+    ibge_id = int(city.ibge_code)
+    existing = await db.scalar(select(City.id).where(City.ibge_id == ibge_id).limit(1))
     if existing:
         raise HTTPException(status_code=400, detail="City already exists with this IBGE code")
 
-    db_city = City(**city.model_dump())
+    # cities has no coordinates: latitude/longitude are not stored
+    db_city = City(ibge_id=ibge_id, name=city.name, uf=city.state.upper(), region=city.region)
     db.add(db_city)
-    db.commit()
-    db.refresh(db_city)
-    return db_city
-
+    # City lists are cached and ETagged by dataset version: publish a new one
+    await db.run_sync(bump_dataset_version)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Created concurrently since the check above
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="City already exists with this IBGE code")
+    await db.refresh(db_city)
+    # Other workers pick the new version up on their next poll
+    await dataset.check()
+    return CityRead(
+        id=db_city.id,
+        name=db_city.name,
+        state=db_city.uf,
+        region=db_city.region,
+        ibge_code=str(db_city.ibge_id),
+    )
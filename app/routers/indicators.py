@@ -1,32 +1,56 @@
 """Indicator endpoints."""
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.cache import cached
+from app.core.http_cache import dataset_etag
+from app.db.session import get_read_db
 from app.models.indicator import Indicator
 from app.models.indicator_value import IndicatorValue
+from app.models.latest_indicator_value import LatestIndicatorValue
 from app.schemas.indicator import IndicatorValueOut
 
 router = APIRouter(tags=["indicators"])
 
 
-@router.get("/cities/{city_id}/indicators", response_model=list[IndicatorValueOut])
-def get_indicators_by_city(city_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/cities/{city_id}/indicators",
+    response_model=list[IndicatorValueOut],
+    dependencies=[Depends(dataset_etag)],
+)
+@cached()
+async def get_indicators_by_city(
+    city_id: int,
+    latest: bool = Query(False, description="Only the latest year of each indicator"),
+    db: AsyncSession = Depends(get_read_db),
+):
     """Get all indicator values for a given city."""
+    # Latest values come precomputed from the latest_indicator_values view.
+    # Otherwise only columns of the (city_id, indicator_id, year) INCLUDE
+    # (value) index are read from indicator_values: an index-only scan.
+    source = LatestIndicatorValue if latest else IndicatorValue
     values = (
-        db.query(IndicatorValue)
-        .join(Indicator)
-        .filter(IndicatorValue.city_id == city_id)
-        .all()
-    )
+        await db.execute(
+            select(
+                Indicator.code,
+                Indicator.name,
+                Indicator.unit,
+                source.year,
+                source.value,
+            )
+            .join(Indicator, Indicator.id == source.indicator_id)
+            .where(source.city_id == city_id)
+        )
+    ).all()
     return [
         IndicatorValueOut(
-            indicator_code=v.indicator.code,
-            indicator_name=v.indicator.name,
+            indicator_code=v.code,
+            indicator_name=v.name,
             year=v.year,
             value=v.value,
-            unit=v.indicator.unit
+            unit=v.unit
         )
         for v in values
     ]
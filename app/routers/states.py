@@ -1,45 +1,41 @@
 """State endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_current_user
-from app.db.session import get_db
+from app.core.cache import cached
+from app.core.deps import get_current_user, get_token_subject
+from app.core.http_cache import dataset_etag
+from app.db.session import get_read_db
 from app.models.city import City
 
 router = APIRouter(prefix="/states", tags=["states"])
 
 
-@router.get("")
-def get_states(
-    db: Session = Depends(get_db),
+@router.get("", dependencies=[Depends(get_token_subject), Depends(dataset_etag)])
+@cached(ttl=3600)
+async def get_states(
+    db: AsyncSession = Depends(get_read_db),
     user=Depends(get_current_user),
 ):
     """Get all unique states (UF) with their regions."""
-    # Query distinct UFs with their regions
-    # Use group_by to get one record per UF (with its region)
+    # Each UF lies in a single region: one row per UF, read off ix_cities_uf_name_id
     states = (
-        db.query(City.uf, City.region)
-        .group_by(City.uf, City.region)
-        .order_by(City.uf)
-        .all()
-    )
-    
-    # Since each UF should have the same region, we can deduplicate by UF
-    seen_ufs = set()
-    result = []
-    for uf, region in states:
-        if uf not in seen_ufs:
-            result.append({"uf": uf, "region": region})
-            seen_ufs.add(uf)
-    
-    return result
+        await db.execute(
+            select(City.uf, func.min(City.region).label("region"))
+            .group_by(City.uf)
+            .order_by(City.uf)
+        )
+    ).all()
+    return [{"uf": uf, "region": region} for uf, region in states]
 
 
-@router.get("/{uf}/cities")
-def get_cities_by_state(
+@router.get("/{uf}/cities", dependencies=[Depends(get_token_subject), Depends(dataset_etag)])
+@cached(ttl=3600)
+async def get_cities_by_state(
     uf: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user=Depends(get_current_user),
 ):
     """Get all cities for a specific state (UF)."""
@@ -49,11 +45,12 @@ def get_cities_by_state(
     
     # Query cities for the state, ordered alphabetically
     cities = (
-        db.query(City)
-        .filter(City.uf == uf.upper())
-        .order_by(City.name)
-        .all()
-    )
+        await db.scalars(
+            select(City)
+            .where(City.uf == uf.upper())
+            .order_by(City.name)
+        )
+    ).all()
     
     if not cities:
         raise HTTPException(status_code=404, detail=f"No cities found for state {uf.upper()}")
@@ -1,7 +1,5 @@
 """City schemas."""
 
-from datetime import datetime
-
 from pydantic import BaseModel, Field
 
 
@@ -9,7 +7,7 @@ class CityBase(BaseModel):
     name: str = Field(..., max_length=255)
     state: str = Field(..., min_length=2, max_length=2, description="Brazilian state acronym")
     region: str | None = Field(default=None, max_length=32)
-    ibge_code: str = Field(..., max_length=20)
+    ibge_code: str = Field(..., max_length=20, pattern=r"^\d+$")
     latitude: float | None = None
     longitude: float | None = None
 
@@ -26,12 +24,11 @@ class CityUpdate(BaseModel):
     longitude: float | None = None
 
 
-class CityRead(CityBase):
+class CityRead(BaseModel):
     id: int
-    created_at: datetime
-    updated_at: datetime
-
-    class Config:
-        from_attributes = True
+    name: str
+    state: str
+    region: str | None = None
+    ibge_code: str
 
 
@@ -0,0 +1,20 @@
+import fakeredis
+import pytest
+
+from app.core.cache_backend import RedisBackend
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def redis_server():
+    """One in-process Redis stand-in; clients built on it share its data."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_backend(redis_server):
+    return RedisBackend(fakeredis.FakeAsyncRedis(server=redis_server))
@@ -0,0 +1,242 @@
+from unittest.mock import Mock
+
+import fakeredis
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import cache as cache_module
+from app.core.cache import MISSING, Cache, cached
+from app.core.cache_backend import MemoryBackend, RedisBackend
+from app.core.dataset import dataset
+from app.core.deps import get_current_user
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+
+class BrokenBackend(MemoryBackend):
+    """A backend whose server is unreachable; counts the calls it gets."""
+
+    shared = True
+
+    def __init__(self):
+        super().__init__(maxsize=10)
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        raise ConnectionError("connection refused")
+
+    async def set(self, key, value, ttl):
+        self.calls += 1
+        raise ConnectionError("connection refused")
+
+
+def session(**info):
+    """An AsyncSession stand-in; replica sessions carry their dataset version."""
+    db = Mock(spec=AsyncSession)
+    db.info = info
+    return db
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = Cache(MemoryBackend(maxsize=100))
+    monkeypatch.setattr(cache_module, "cache", cache)
+    return cache
+
+
+@pytest.fixture
+def version(monkeypatch):
+    monkeypatch.setattr(dataset, "version", "v1")
+
+
+async def test_caches_share_a_redis_server(redis_server):
+    first = Cache(RedisBackend(fakeredis.FakeAsyncRedis(server=redis_server)))
+    second = Cache(RedisBackend(fakeredis.FakeAsyncRedis(server=redis_server)))
+
+    await first.set("states", [{"uf": "SP"}], ttl=60)
+
+    assert await second.get("states") == [{"uf": "SP"}]
+    assert await second.get("other") is MISSING
+    assert (second.hits, second.misses) == (1, 1)
+
+
+async def test_shared_cache_is_not_flushed_on_a_new_version(redis_backend):
+    cache = Cache(redis_backend)
+    await cache.set("route:v2:states", [], ttl=60)
+    await cache.invalidate("v2")
+    assert await cache.get("route:v2:states") == []
+
+
+async def test_private_cache_is_flushed_on_a_new_version():
+    cache = Cache(MemoryBackend(maxsize=10))
+    await cache.set("route:v1:states", [], ttl=60)
+    await cache.invalidate("v2")
+    assert await cache.get("route:v1:states") is MISSING
+
+
+async def test_backend_errors_are_misses():
+    backend = BrokenBackend()
+    cache = Cache(backend, retry_seconds=30)
+
+    assert await cache.get("states") is MISSING
+    await cache.set("states", [], ttl=60)
+
+    assert cache.misses == 1
+    assert cache.errors == 1
+    assert not cache.stats()["up"]
+
+
+async def test_unreachable_backend_is_skipped_until_retry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    backend = BrokenBackend()
+    cache = Cache(backend, retry_seconds=30)
+
+    for _ in range(5):
+        await cache.get("states")
+        await cache.set("states", [], ttl=60)
+    # Only the first call waited on the backend
+    assert backend.calls == 1
+
+    now[0] += 30
+    await cache.get("states")
+    assert backend.calls == 2
+
+
+async def test_backend_is_used_again_once_it_recovers(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = Cache(BrokenBackend(), retry_seconds=30)
+    await cache.get("states")
+
+    cache.backend = MemoryBackend(maxsize=10)
+    now[0] += 30
+    await cache.set("states", [], ttl=60)
+    assert cache.up
+    assert await cache.get("states") == []
+
+
+async def test_cached_route_runs_once_per_key(cache, version):
+    calls = []
+
+    @cached(ttl=60)
+    async def get_cities_by_state(uf: str, db=None, user=None):
+        calls.append(uf)
+        return [{"uf": uf}]
+
+    db = session()
+    assert await get_cities_by_state(uf="SP", db=db, user="a@example.com") == [{"uf": "SP"}]
+    # Another session and user: same key
+    assert await get_cities_by_state(uf="SP", db=session(), user="b@example.com") == [{"uf": "SP"}]
+    await get_cities_by_state(uf="RJ", db=db, user="a@example.com")
+
+    assert calls == ["SP", "RJ"]
+
+
+async def test_cached_key_carries_the_dataset_version(cache, version):
+    keys = []
+    get = cache.get
+
+    async def spy(key):
+        keys.append(key)
+        return await get(key)
+
+    cache.get = spy
+
+    @cached(ttl=60)
+    async def get_states(db=None, user=None):
+        return ["v"]
+
+    await get_states(db=session(), user=None)
+    dataset.version = "v2"
+    await get_states(db=session(), user=None)
+
+    assert keys == [
+        f"route:v1:{__name__}.test_cached_key_carries_the_dataset_version.<locals>.get_states::",
+        f"route:v2:{__name__}.test_cached_key_carries_the_dataset_version.<locals>.get_states::",
+    ]
+    assert cache.misses == 2
+
+
+async def test_results_of_a_lagging_replica_are_not_stored(cache, version):
+    calls = []
+
+    @cached(ttl=60)
+    async def get_states(db=None):
+        calls.append(db.info.get("dataset_version"))
+        return ["SP"]
+
+    await get_states(db=session(dataset_version="v0"))
+    await get_states(db=session(dataset_version=None))
+    assert cache.stats()["size"] == 0
+
+    await get_states(db=session(dataset_version="v1"))
+    await get_states(db=session(dataset_version="v0"))
+    assert calls == ["v0", None, "v1"]
+
+
+async def test_per_user_keys(cache, version):
+    calls = []
+
+    @cached(ttl=60, per_user=True)
+    async def favourites(user=None):
+        calls.append(user.id)
+        return [user.id]
+
+    alice, bob = User(id=1, email="alice@example.com"), User(id=2, email="bob@example.com")
+    assert await favourites(user=alice) == [1]
+    assert await favourites(user=bob) == [2]
+    assert await favourites(user=alice) == [1]
+    assert calls == [1, 2]
+
+
+def test_cached_rejects_sync_routes():
+    with pytest.raises(TypeError):
+        @cached()
+        def search():
+            return []
+
+
+class FakeSession:
+    """The two AsyncSession calls get_current_user makes."""
+
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def scalar(self, statement):
+        self.queries += 1
+        return self.user
+
+    async def commit(self):
+        pass
+
+
+async def test_current_user_is_cached(monkeypatch, redis_backend):
+    cache = Cache(redis_backend)
+    monkeypatch.setattr("app.core.deps.cache", cache)
+    db = FakeSession(User(id=7, email="ana@example.com", hashed_password="hash", is_active=True))
+
+    first = await get_current_user(email="ana@example.com", db=db)
+    second = await get_current_user(email="ana@example.com", db=db)
+
+    assert db.queries == 1
+    assert (second.id, second.email, second.is_active) == (first.id, first.email, True)
+    # The password hash never goes to the cache
+    assert second.hashed_password is None
+
+
+async def test_inactive_user_is_not_cached(monkeypatch, redis_backend):
+    cache = Cache(redis_backend)
+    monkeypatch.setattr("app.core.deps.cache", cache)
+    db = FakeSession(User(id=7, email="ana@example.com", is_active=False))
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            await get_current_user(email="ana@example.com", db=db)
+        assert error.value.status_code == 401
+
+    assert db.queries == 2
@@ -0,0 +1,78 @@
+import pytest
+
+from app.core.cache_backend import MemoryBackend, RedisBackend, create_backend, pack, unpack
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    """Stands in for time.monotonic()."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("app.core.cache_backend.time.monotonic", clock)
+    return clock
+
+
+def test_pack_round_trip():
+    value = [{"uf": "SP", "region": "Sudeste", "area": 1521.11, "year": None}]
+    assert unpack(pack(value)) == value
+
+
+async def test_memory_evicts_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    # Reading "a" makes "b" the least recently used
+    assert await backend.get("a") == b"1"
+    await backend.set("c", b"3", ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == b"1"
+    assert await backend.get("c") == b"3"
+    assert backend.stats()["evictions"] == 1
+
+
+async def test_memory_expires_entries(clock):
+    backend = MemoryBackend(maxsize=10)
+    await backend.set("a", b"1", ttl=5)
+    clock.now += 4.9
+    assert await backend.get("a") == b"1"
+    clock.now += 0.1
+    assert await backend.get("a") is None
+    assert backend.stats()["size"] == 0
+
+
+async def test_redis_get_set_with_ttl(redis_backend):
+    await redis_backend.set("states", b"payload", ttl=1.5)
+
+    assert await redis_backend.get("states") == b"payload"
+    assert await redis_backend.get("missing") is None
+    assert await redis_backend.client.pttl("cityscope:states") in range(1, 1501)
+
+
+async def test_redis_clear_only_drops_prefixed_keys(redis_backend):
+    for i in range(1200):
+        await redis_backend.set(f"key:{i}", b"x", ttl=60)
+    await redis_backend.client.set("other:key", b"kept")
+
+    await redis_backend.clear()
+
+    assert [key async for key in redis_backend.client.scan_iter(match="cityscope:*")] == []
+    assert await redis_backend.client.get("other:key") == b"kept"
+
+
+def test_create_backend():
+    assert isinstance(create_backend("memory://"), MemoryBackend)
+    assert isinstance(create_backend(""), MemoryBackend)
+    assert isinstance(create_backend("redis://localhost:6379/0"), RedisBackend)
+    with pytest.raises(ValueError):
+        create_backend("memcached://localhost")
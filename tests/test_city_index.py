@@ -0,0 +1,98 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.cache import Cache
+from app.core.cache_backend import MemoryBackend
+from app.core.city_index import CityEntry, CityIndex, normalize
+from app.core.security import create_access_token
+from app.db.session import get_async_db
+from app.main import app
+from app.models.user import User
+
+WORDS = ["São", "Santa", "Santo", "Antônio", "José", "do", "d'Oeste", "Rio", "Rita", "Paulo", "Sapé", "Sul"]
+UFS = ["SP", "RJ", "MG", "BA", "RO"]
+
+
+def brute_force(cities, query, limit, uf=None):
+    """Rank every city by hand: whole name, name prefix, later word prefix."""
+    q = normalize(query)
+    ranked = []
+    for city in cities:
+        if uf and city.uf != uf.upper():
+            continue
+        words = normalize(city.name).split(" ")
+        name = " ".join(words)
+        if name == q:
+            rank = 0
+        elif name.startswith(q):
+            rank = 1
+        elif any(" ".join(words[i:]).startswith(q) for i in range(1, len(words))):
+            rank = 2
+        else:
+            continue
+        ranked.append((rank, -(city.population or 0), city.id))
+    return [city_id for *_, city_id in sorted(ranked)[:limit]] if q else []
+
+
+@pytest.fixture(scope="module")
+def cities():
+    rng = random.Random(7)
+    populations = rng.sample(range(1, 10_000_000), 2000)
+    return [
+        CityEntry(i, " ".join(rng.choices(WORDS, k=rng.randint(1, 4))), rng.choice(UFS), populations[i])
+        for i in range(2000)
+    ]
+
+
+def test_matches_brute_force(cities):
+    index = CityIndex.build("v1", cities)
+    rng = random.Random(11)
+    queries = ["sao", "SÃO", "santa r", "d oeste", "jose", "rio", "s", "sul", "xyz", "", "  ", "do"]
+    for word in rng.choices(WORDS, k=50):
+        queries.append(word[: rng.randint(1, len(word))])
+    for query in queries:
+        for limit in (1, 10, 50):
+            found = [c.id for c in index.search(query, limit)]
+            assert found == brute_force(cities, query, limit), (query, limit)
+            for uf in ("sp", "BA"):
+                found = [c.id for c in index.search(query, limit, uf)]
+                assert found == brute_force(cities, query, limit, uf), (query, limit, uf)
+
+
+def test_exact_name_ranks_first():
+    index = CityIndex.build("v1", [
+        CityEntry(1, "São Paulo", "SP", 12_000_000),
+        CityEntry(2, "Santa Rita do Sapucaí", "MG", 40_000),
+        CityEntry(3, "Sapé", "PB", 30_000),
+        CityEntry(4, "Rio Sapé", "BA", 90_000_000),
+    ])
+    assert [c.id for c in index.search("sape", 10)] == [3, 4]
+    assert [c.id for c in index.search("SAO PAULO", 10)] == [1]
+    assert index.search("sp", 10, uf="AM") == []
+
+
+class UserSession:
+    async def scalar(self, statement):
+        return User(id=1, email="ana@example.com", is_active=False)
+
+    async def commit(self):
+        pass
+
+
+def test_search_rejects_inactive_users(monkeypatch):
+    async def session():
+        yield UserSession()
+
+    monkeypatch.setattr("app.core.deps.cache", Cache(MemoryBackend(maxsize=10)))
+    app.dependency_overrides[get_async_db] = session
+    try:
+        response = TestClient(app).get(
+            "/cities/search",
+            params={"q": "sao"},
+            headers={"Authorization": f"Bearer {create_access_token('ana@example.com')}"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 401
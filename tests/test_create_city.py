@@ -0,0 +1,115 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.core.dataset import dataset
+from app.core.deps import get_current_user
+from app.db.session import get_async_db
+from app.etl.watermarks import bump_dataset_version
+from app.main import app
+from app.models.city import City
+
+PAYLOAD = {"name": "São Paulo", "state": "sp", "region": "Sudeste", "ibge_code": "3550308"}
+
+
+class CitySession:
+    """Just enough of an AsyncSession for create_city."""
+
+    def __init__(self, existing=None, conflict=False):
+        self.existing = existing
+        self.conflict = conflict
+        self.statements = []
+        self.added = []
+        self.synced = []
+        self.committed = self.rolled_back = False
+
+    async def scalar(self, statement):
+        self.statements.append(statement)
+        return self.existing
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def run_sync(self, fn):
+        self.synced.append(fn)
+
+    async def commit(self):
+        if self.conflict:
+            raise IntegrityError("INSERT INTO cities", {}, Exception("duplicate key"))
+        self.committed = True
+
+    async def rollback(self):
+        self.rolled_back = True
+
+    async def refresh(self, obj):
+        obj.id = 42
+
+
+@pytest.fixture
+def create(monkeypatch):
+    checks = []
+
+    async def check():
+        checks.append(True)
+        return True
+
+    monkeypatch.setattr(dataset, "check", check)
+
+    def create(db):
+        async def session():
+            yield db
+
+        app.dependency_overrides[get_async_db] = session
+        app.dependency_overrides[get_current_user] = lambda: {"id": 1, "email": "ana@example.com"}
+        try:
+            return TestClient(app).post("/cities", json=PAYLOAD), checks
+        finally:
+            app.dependency_overrides.clear()
+
+    return create
+
+
+def test_creates_the_city_and_publishes_a_new_version(create):
+    db = CitySession()
+    response, checks = create(db)
+
+    assert response.status_code == 201
+    assert response.json() == {
+        "id": 42, "name": "São Paulo", "state": "SP", "region": "Sudeste", "ibge_code": "3550308",
+    }
+    (city,) = db.added
+    assert isinstance(city, City)
+    assert (city.ibge_id, city.name, city.uf, city.region) == (3550308, "São Paulo", "SP", "Sudeste")
+    assert db.synced == [bump_dataset_version]
+    assert db.committed
+    assert checks == [True]
+
+
+def test_duplicates_are_looked_up_by_ibge_id(create):
+    db = CitySession(existing=7)
+    response, checks = create(db)
+
+    assert response.status_code == 400
+    (statement,) = db.statements
+    assert "cities.ibge_id" in str(statement)
+    assert statement.compile().params["ibge_id_1"] == 3550308
+    assert db.added == [] and db.synced == []
+    assert checks == []
+
+
+def test_concurrent_duplicate_is_rejected(create):
+    db = CitySession(conflict=True)
+    response, checks = create(db)
+
+    assert response.status_code == 400
+    assert db.rolled_back
+    assert checks == []
+
+
+def test_ibge_code_must_be_numeric(create):
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+    try:
+        response = TestClient(app).post("/cities", json={**PAYLOAD, "ibge_code": "SP-01"})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 422
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from app.etl.fetch import AsyncFetcher, FetchJob, RateLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+class Server:
+    """MockTransport handler answering each URL from a scripted list of statuses."""
+
+    def __init__(self, script=None, default=200, delay=0.0):
+        # path -> statuses for the successive requests; the last one repeats
+        self.script = script or {}
+        self.default = default
+        self.delay = delay
+        self.requests: Counter[str] = Counter()
+        self.in_flight = self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        statuses = self.script.get(path, [self.default])
+        status = statuses[min(self.requests[path], len(statuses) - 1)]
+        self.requests[path] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if status == "reset":
+            raise httpx.ConnectError("connection reset", request=request)
+        if status == 429:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if status >= 400:
+            return httpx.Response(status)
+        return httpx.Response(200, json={"path": path})
+
+
+def fetcher(server, **kwargs):
+    kwargs = {"concurrency": 4, "rate_per_host": 0, "max_retries": 3, "backoff": 0.0, **kwargs}
+    return AsyncFetcher(transport=httpx.MockTransport(server), **kwargs)
+
+
+def jobs(*paths):
+    return [FetchJob(key=path, url=f"https://ibge.test{path}") for path in paths]
+
+
+async def fetch(f, job_list, **kwargs):
+    async with f:
+        return {job.key: data async for job, data in f.fetch_all(job_list, **kwargs)}
+
+
+async def test_transient_failures_are_retried_until_success():
+    server = Server({"/a": [429, 503, 200], "/b": ["reset", 502, 200], "/c": [200]})
+    f = fetcher(server)
+
+    results = await fetch(f, jobs("/a", "/b", "/c"))
+
+    assert results == {path: {"path": path} for path in ("/a", "/b", "/c")}
+    assert server.requests == {"/a": 3, "/b": 3, "/c": 1}
+    assert f.failed == []
+
+
+async def test_jobs_failing_every_round_are_reported():
+    server = Server({"/down": [500]})
+    f = fetcher(server, max_retries=2, rounds=2)
+
+    results = await fetch(f, jobs("/ok", "/down"))
+
+    assert results == {"/ok": {"path": "/ok"}}
+    # max_retries + 1 attempts in each of the rounds
+    assert server.requests["/down"] == 3 * 2
+    assert [job.key for job in f.failed] == ["/down"]
+    assert f.failed[0].error == "https://ibge.test/down: HTTP 500"
+
+
+async def test_a_failed_round_is_retried_in_the_next():
+    # Fails all attempts of the first round, succeeds in the second
+    server = Server({"/flaky": [503, 503, 200]})
+    f = fetcher(server, max_retries=1, rounds=2)
+
+    results = await fetch(f, jobs("/flaky"))
+
+    assert results == {"/flaky": {"path": "/flaky"}}
+    assert server.requests["/flaky"] == 3
+    assert f.failed == []
+
+
+async def test_client_errors_are_not_retried():
+    server = Server({"/missing": [404]})
+    f = fetcher(server, rounds=1)
+
+    assert await fetch(f, jobs("/missing")) == {}
+    assert server.requests["/missing"] == 1
+    assert f.failed[0].error == "https://ibge.test/missing: HTTP 404"
+
+
+async def test_concurrency_is_bounded():
+    server = Server(delay=0.01)
+    f = fetcher(server, concurrency=3)
+
+    results = await fetch(f, jobs(*(f"/{i}" for i in range(20))))
+
+    assert len(results) == 20
+    assert server.max_in_flight == 3
+
+
+async def test_spooled_downloads_carry_the_body_hash():
+    server = Server()
+    f = fetcher(server)
+    body = b'{"path":"/a"}'
+
+    async with f:
+        async for job, data in f.fetch_all(jobs("/a"), spool=True):
+            with data:
+                assert data.read() == body
+            assert job.sha256 == hashlib.sha256(body).hexdigest()
+
+
+def test_backoff_is_jittered_and_capped():
+    f = AsyncFetcher(backoff=0.5, max_backoff=4.0)
+    for attempt in range(8):
+        for _ in range(50):
+            assert 0 <= f._delay(attempt) <= min(4.0, 0.5 * 2**attempt)
+    assert f._delay(0, retry_after="3") == 3.0
+    assert f._delay(0, retry_after="120") == 4.0
+    # Dates are not parsed; fall back to the backoff window
+    assert f._delay(0, retry_after="Wed, 21 Oct 2026 07:28:00 GMT") <= 0.5
+
+
+async def test_rate_limiter_spaces_requests_per_host():
+    limiter = RateLimiter(rate=20, burst=2)
+
+    start = time.monotonic()
+    for _ in range(6):
+        await limiter.acquire("ibge.test")
+    # 2 from the burst, then one every 1/20 s
+    assert time.monotonic() - start >= 4 / 20 * 0.9
+
+    start = time.monotonic()
+    await limiter.acquire("other.test")
+    assert time.monotonic() - start < 0.05
+
+
+async def test_zero_rate_disables_the_limiter():
+    limiter = RateLimiter(rate=0)
+    start = time.monotonic()
+    for _ in range(100):
+        await limiter.acquire("ibge.test")
+    assert time.monotonic() - start < 0.05
@@ -0,0 +1,103 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.dataset import dataset
+from app.core.http_cache import _matches, dataset_etag
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(calls, monkeypatch):
+    monkeypatch.setattr(dataset, "version", "v1")
+    app = FastAPI()
+
+    @app.get("/cities", dependencies=[Depends(dataset_etag)])
+    def get_cities(uf: str | None = None):
+        calls.append(uf)
+        return [{"uf": uf}]
+
+    return TestClient(app)
+
+
+def test_first_request_gets_an_etag(client, calls):
+    response = client.get("/cities")
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Cache-Control"] == f"public, max-age={settings.HTTP_CACHE_MAX_AGE}"
+    assert "Vary" not in response.headers
+    assert calls == [None]
+
+
+def test_current_copy_gets_304_without_running_the_route(client, calls):
+    etag = client.get("/cities?uf=SP").headers["ETag"]
+
+    response = client.get("/cities?uf=SP", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert "Cache-Control" in response.headers
+    assert calls == ["SP"]
+
+
+@pytest.mark.parametrize("header", [
+    "*",
+    " * ",
+    "{etag}",
+    "{strong}",
+    'W/"other", {etag}',
+    '"other",{strong} , W/"more"',
+])
+def test_if_none_match_forms(client, calls, header):
+    etag = client.get("/cities").headers["ETag"]
+    header = header.format(etag=etag, strong=etag.removeprefix("W/"))
+
+    assert client.get("/cities", headers={"If-None-Match": header}).status_code == 304
+
+
+@pytest.mark.parametrize("header", ["", 'W/"other"', '"other", W/"more"', "W/*"])
+def test_stale_or_foreign_etags_get_the_body(client, header):
+    response = client.get("/cities", headers={"If-None-Match": header})
+    assert response.status_code == 200
+    assert response.json() == [{"uf": None}]
+
+
+def test_etag_depends_on_the_query_but_not_its_order(client):
+    base = client.get("/cities?uf=SP&limit=10").headers["ETag"]
+    assert client.get("/cities?limit=10&uf=SP").headers["ETag"] == base
+    assert client.get("/cities?uf=RJ&limit=10").headers["ETag"] != base
+
+
+def test_new_dataset_version_invalidates_etags(client, monkeypatch):
+    etag = client.get("/cities").headers["ETag"]
+    monkeypatch.setattr(dataset, "version", "v2")
+
+    response = client.get("/cities", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_authenticated_responses_vary_on_authorization(client):
+    response = client.get("/cities", headers={"Authorization": "Bearer token"})
+    assert response.headers["Vary"] == "Authorization"
+
+    response = client.get(
+        "/cities", headers={"Authorization": "Bearer token", "If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert response.headers["Vary"] == "Authorization"
+
+
+def test_matches():
+    assert not _matches(None, 'W/"a"')
+    assert not _matches("", 'W/"a"')
+    assert _matches('"a"', 'W/"a"')
+    assert _matches('W/"a"', '"a"')
+    assert not _matches('"ab"', 'W/"a"')
@@ -0,0 +1,98 @@
+import io
+import json
+
+import pytest
+
+from app.etl.jsonstream import JSONArrayParser, aiter_json_array, iter_json_array, read_chunks
+
+PAYLOAD = json.dumps(
+    [
+        {"id": 3550308, "nome": "São Paulo", "area": 1521.11, "pop": 11451245},
+        {"id": 1, "nome": 'aspas "e" barra \\ e \\u00e9', "tags": ["a", "b,c", "]"]},
+        {"v": -1.5e-3, "n": None, "ok": True, "no": False, "vazio": {}, "lista": []},
+        "texto com , e ] dentro",
+        12345678901234567890,
+        0.25,
+        -7,
+        [],
+        {"emoji": "\U0001f600", "escape": "ç\n\t"},
+        1e10,
+    ],
+    ensure_ascii=False,
+    indent=1,
+).encode()
+
+pytestmark = pytest.mark.anyio
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 11, 16, 64, 1024, len(PAYLOAD)])
+def test_any_chunking_decodes_like_json_loads(size):
+    # Small sizes split inside strings, escapes, multi-byte characters and numbers
+    assert list(iter_json_array(chunked(PAYLOAD, size))) == json.loads(PAYLOAD)
+
+
+def test_every_split_point():
+    expected = json.loads(PAYLOAD)
+    for cut in range(len(PAYLOAD) + 1):
+        assert list(iter_json_array([PAYLOAD[:cut], PAYLOAD[cut:]])) == expected, cut
+
+
+@pytest.mark.parametrize("payload", [b"[]", b" [ ] ", b"[1]", b'["]"]', b"[1.5,\n-2,3e2]", b"[[[]]]"])
+def test_small_arrays(payload):
+    assert list(iter_json_array(chunked(payload, 1))) == json.loads(payload)
+
+
+def test_numbers_are_not_cut_at_chunk_boundaries():
+    parser = JSONArrayParser()
+    assert parser.feed(b"[12") == []
+    assert parser.feed(b"34.5") == []
+    assert parser.feed(b"6,") == [1234.56]
+    assert parser.feed(b"7]") == [7]
+    assert parser.close() == []
+
+
+def test_items_are_yielded_as_they_complete():
+    parser = JSONArrayParser()
+    assert parser.feed(b'[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(b": 2}]") == [{"b": 2}]
+
+
+async def test_async_iteration():
+    async def chunks():
+        for chunk in chunked(PAYLOAD, 7):
+            yield chunk
+
+    assert [item async for item in aiter_json_array(chunks())] == json.loads(PAYLOAD)
+
+
+def test_read_chunks():
+    assert list(iter_json_array(read_chunks(io.BytesIO(PAYLOAD), size=13))) == json.loads(PAYLOAD)
+
+
+@pytest.mark.parametrize("cut", [0, 1, len(PAYLOAD) // 3, len(PAYLOAD) // 2, len(PAYLOAD) - 1])
+def test_truncated_input_raises(cut):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(PAYLOAD[:cut], 5)))
+
+
+@pytest.mark.parametrize("payload", [
+    b'{"a": 1}',
+    b"1",
+    b"[1 2]",
+    b"[1,,2]",
+    b"[1,]",
+    b"[,1]",
+    b"[1] 2",
+    b"[tru]",
+    b'["unterminated]',
+    b"[1.2.3]",
+    b"[\xff]",
+])
+@pytest.mark.parametrize("size", [1, 3, 1024])
+def test_invalid_input_raises(payload, size):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(payload, size)))
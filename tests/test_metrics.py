@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.db.pool import PoolMetrics, engine_options, pool_status
+from app.main import app
+
+
+@pytest.mark.parametrize("path", ["/metrics/pool", "/metrics/cache"])
+def test_metrics_require_authentication(path):
+    assert TestClient(app).get(path).status_code == 401
+
+
+def test_cache_metrics_for_users():
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1, "email": "ana@example.com"}
+    try:
+        response = TestClient(app).get("/metrics/cache")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert {"hits", "misses"} <= response.json().keys()
+
+
+def test_pool_status_of_a_metered_pool():
+    metrics = PoolMetrics()
+    engine = create_engine("sqlite://", **{**engine_options(metrics), "pool_pre_ping": False})
+    with engine.connect() as conn:
+        conn.execute(text("select 1"))
+        status = pool_status(engine.pool)
+    assert status["checked_out"] == 1
+    assert status["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert status["checkouts"] == 1
+
+    # dispose() recreates the pool with the same settings and counters
+    engine.dispose()
+    status = pool_status(engine.pool)
+    assert status["size"] == settings.DB_POOL_SIZE
+    assert status["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert status["checkouts"] == 1
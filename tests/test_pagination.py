@@ -0,0 +1,54 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+TYPES = (str, str, int)
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("key", [
+    ("SP", "São Paulo", 3550308),
+    ("AC", "", 1),
+    ("RS", "Sant'Ana do Livramento", 4317103),
+    ("MG", 'com "aspas" e \\ barra', 2**40),
+    ("PA", "名前", 0),
+])
+def test_round_trip(key):
+    cursor = encode_cursor(*key)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, TYPES) == list(key)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor("SP", "???>>>" * 10, 1)
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    "%%%",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor({"uf": "SP"}),
+    raw_cursor("SP"),
+    raw_cursor(["SP", "São Paulo"]),
+    raw_cursor(["SP", "São Paulo", 1, 2]),
+    raw_cursor(["SP", None, 1]),
+    raw_cursor([None, "São Paulo", 1]),
+    raw_cursor(["SP", "São Paulo", "1"]),
+    raw_cursor(["SP", "São Paulo", 1.0]),
+    raw_cursor(["SP", "São Paulo", True]),
+    raw_cursor(["SP", 1, 1]),
+])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor, TYPES)
+    assert e.value.status_code == 400
+    assert e.value.detail == "Invalid cursor"
@@ -0,0 +1,155 @@
+import threading
+
+import pytest
+
+from app.etl.ibge.common import LoadStats
+from app.etl.pipeline import Pipeline, PipelineError, Step
+
+
+class MemoryPipeline(Pipeline):
+    """Pipeline checkpointing into a dict instead of etl_step_runs."""
+
+    def __init__(self, steps, runs=None, **kwargs):
+        super().__init__(steps, **kwargs)
+        # run_id -> {step: status}, in insertion (start) order
+        self.runs: dict[str, dict[str, str]] = runs if runs is not None else {}
+        self._lock = threading.Lock()
+
+    def _resumable_run(self, db):
+        if not self.runs:
+            return None
+        run_id = list(self.runs)[-1]
+        done = {step for step, status in self.runs[run_id].items() if status == "done"}
+        if set(self.steps) <= done:
+            return None
+        return run_id, done
+
+    def _checkpoint(self, run_id, step, **values):
+        with self._lock:
+            self.runs.setdefault(run_id, {})[step] = values["status"]
+
+
+class Recorder:
+    def __init__(self):
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def step(self, name, deps=(), fail=False, stats=None):
+        def run(ctx):
+            with self._lock:
+                self.calls.append(name)
+            if fail:
+                raise RuntimeError(f"{name} broke")
+            return stats
+
+        return Step(name, run, deps)
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="unknown step 'missing'"):
+        MemoryPipeline([Step("a", lambda ctx: None, deps=("missing",))])
+
+
+def test_dependency_cycle_is_rejected():
+    steps = [
+        Step("a", lambda ctx: None, deps=("c",)),
+        Step("b", lambda ctx: None, deps=("a",)),
+        Step("c", lambda ctx: None, deps=("b",)),
+    ]
+    with pytest.raises(ValueError, match="cycle"):
+        MemoryPipeline(steps)
+
+
+def test_steps_run_after_their_dependencies():
+    rec = Recorder()
+    pipeline = MemoryPipeline([
+        rec.step("publish", deps=("refresh", "snapshots")),
+        rec.step("refresh", deps=("sidra",)),
+        rec.step("snapshots", deps=("sidra",)),
+        rec.step("sidra", deps=("cities",)),
+        rec.step("cities"),
+    ])
+
+    reports = pipeline.run()
+
+    order = rec.calls
+    assert sorted(order) == ["cities", "publish", "refresh", "sidra", "snapshots"]
+    assert order[0] == "cities" and order[1] == "sidra" and order[-1] == "publish"
+    assert {r.status for r in reports} == {"done"}
+
+
+def test_failed_step_blocks_its_dependents():
+    rec = Recorder()
+    pipeline = MemoryPipeline([
+        rec.step("cities"),
+        rec.step("sidra", deps=("cities",), fail=True),
+        rec.step("publish", deps=("sidra",)),
+    ])
+
+    with pytest.raises(PipelineError) as error:
+        pipeline.run()
+
+    assert error.value.failed == ["sidra"]
+    assert "publish" not in rec.calls
+    assert pipeline.runs[error.value.run_id] == {"cities": "done", "sidra": "failed"}
+
+
+def test_step_with_failed_fetches_fails():
+    rec = Recorder()
+    incomplete = LoadStats(inserted=10, failed=[("POP", "SP", "all")])
+    pipeline = MemoryPipeline([
+        rec.step("sidra", stats=incomplete),
+        rec.step("publish", deps=("sidra",)),
+    ])
+
+    with pytest.raises(PipelineError) as error:
+        pipeline.run()
+
+    assert error.value.failed == ["sidra"]
+    assert rec.calls == ["sidra"]
+
+
+def test_resume_skips_steps_already_done():
+    runs = {"run1": {"cities": "done", "sidra": "failed"}}
+    rec = Recorder()
+    pipeline = MemoryPipeline(
+        [
+            rec.step("cities"),
+            rec.step("sidra", deps=("cities",)),
+            rec.step("publish", deps=("sidra",)),
+        ],
+        runs=runs,
+    )
+
+    reports = pipeline.run()
+
+    assert rec.calls == ["sidra", "publish"]
+    assert runs == {"run1": {"cities": "done", "sidra": "done", "publish": "done"}}
+    assert {r.step: r.status for r in reports}["cities"] == "resumed"
+
+
+def test_restart_ignores_the_unfinished_run():
+    runs = {"run1": {"cities": "done", "sidra": "failed"}}
+    rec = Recorder()
+    pipeline = MemoryPipeline([rec.step("cities"), rec.step("sidra", deps=("cities",))], runs=runs)
+
+    pipeline.run(resume=False)
+
+    assert rec.calls == ["cities", "sidra"]
+    assert len(runs) == 2
+
+
+def test_unchanged_cities_are_passed_downstream():
+    seen = {}
+
+    def density(ctx):
+        seen["ids"] = ctx.changed_city_ids("cities")
+        return None
+
+    pipeline = MemoryPipeline([
+        Step("cities", lambda ctx: LoadStats(city_ids={1, 2})),
+        Step("density", density, deps=("cities",)),
+    ])
+    pipeline.run()
+
+    assert seen["ids"] == {1, 2}